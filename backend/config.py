@@ -10,6 +10,15 @@ class Settings(BaseSettings):
     google_application_credentials: str
     documentai_processor_id: str
     documentai_location: str = "us"
+    documentai_shard_pages: int = 15       # online processing page limit per request
+    documentai_max_concurrency: int = 4    # shard requests in flight across all documents
+    text_layer_fast_path: bool = True      # read born-digital pages locally, OCR only scanned ones
+    text_layer_min_quality: float = 0.6    # see pdf_service.text_layer_quality
+
+    # Blocking SDK thread pools (services/google_clients.py)
+    documentai_executor_workers: int = 4   # >= documentai_max_concurrency
+    speech_executor_workers: int = 4       # >= voice_stt_max_concurrency; streams hold a thread
+    embedding_executor_workers: int = 8    # >= 2 task types x embedding_max_concurrency
 
     # Neo4j
     neo4j_uri: str
@@ -21,6 +30,48 @@ class Settings(BaseSettings):
     qdrant_port: int = 6333
     qdrant_collection_name: str = "paper_brain_chunks"
     qdrant_vector_size: int = 768  # text-embedding-004 output dimension
+    qdrant_hybrid_search: bool = True  # fuse dense and BM25 sparse results; False searches dense only
+    qdrant_prefetch_limit: int = 20    # candidates per vector type before fusion
+
+    # Embeddings
+    embedding_batch_window_ms: float = 5.0   # how long queued texts wait for company
+    embedding_max_batch_size: int = 250      # Vertex per-request instance limit
+    embedding_max_batch_tokens: int = 15000  # under the 20k tokens/request limit
+    embedding_max_concurrency: int = 4       # batches in flight per task type
+    embedding_cache_path: str = ".cache/embeddings.sqlite3"  # empty string disables
+    embedding_cache_max_entries: int = 200_000
+    query_embedding_lru_size: int = 1024   # in-memory query vectors; 0 disables
+
+    # Ingestion
+    neo4j_write_batch_size: int = 500  # DocumentChunk rows per UNWIND transaction
+    qdrant_upsert_batch_size: int = 256      # points per upsert request
+    qdrant_upsert_parallelism: int = 4       # upsert requests in flight per document
+    qdrant_upsert_retries: int = 3           # attempts per batch before the job fails
+    max_document_upload_bytes: int = 20 * 1024 * 1024
+    max_voice_upload_bytes: int = 10 * 1024 * 1024
+    max_voice_batch_files: int = 50
+    voice_stt_max_concurrency: int = 4   # streaming recognitions in flight
+    voice_ner_window_chars: int = 1500  # transcript text per NER call (~1.5 min of speech)
+    voice_ner_max_concurrency: int = 8   # Gemini extractions in flight
+    ingest_workers: int = 2            # documents processed concurrently
+    ingest_job_dir: str = ".cache/ingest_jobs"
+    ingest_job_db_path: str = ".cache/ingest_jobs.sqlite3"
+
+    # Query
+    # Speculative embedding has no effect while the answer cache is enabled:
+    # the cache lookup already embeds the query before routing.
+    graphrag_speculative_embedding: bool = False  # embed the query while it is being routed
+    graphrag_tag_filtered_search: bool = True  # search chunks of the asset tags in the question first
+    graph_backend: str = "memory"    # topology mirror once loaded; "neo4j" always runs the Cypher cascade
+    graph_cascade_depth: int = 4     # CONNECTED_TO hops followed up- and downstream
+    graph_max_fanout: int = 25       # assets with more connections aren't expanded through
+    graph_max_paths: int = 50        # paths kept per asset and direction
+    context_token_budget: int = 3000      # fused prompt context, documents + topology
+    context_graph_share: float = 0.35     # reserved for topology; unused share goes to documents
+    context_dedup_overlap: float = 0.8    # share of a chunk's word trigrams already in context
+    answer_cache_max_entries: int = 512      # 0 disables the semantic answer cache
+    answer_cache_ttl_s: float = 900.0
+    answer_cache_min_similarity: float = 0.95  # cosine between query embeddings
 
     # App
     environment: str = "development"
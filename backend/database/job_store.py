@@ -0,0 +1,133 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from config import get_settings
+
+ACTIVE_STATUSES = ("queued", "running")
+
+_store: "JobStore | None" = None
+
+
+class JobStore:
+    # Small SQLite table of ingestion jobs so queued and running work
+    # survives a process restart.
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                asset_tag TEXT,
+                file_path TEXT NOT NULL,
+                options TEXT NOT NULL DEFAULT '{}',
+                progress TEXT NOT NULL DEFAULT '{}',
+                result TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+
+    def create(
+        self,
+        job_id: str,
+        kind: str,
+        filename: str,
+        file_path: str,
+        asset_tag: str | None = None,
+        options: dict | None = None
+    ) -> dict:
+        now = _now()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO jobs (id, kind, status, filename, asset_tag, file_path, options, created_at, updated_at)
+                VALUES (?, ?, 'queued', ?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, kind, filename, asset_tag, file_path, json.dumps(options or {}), now, now)
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _to_dict(row) if row else None
+
+    def list(self, statuses: tuple[str, ...] | None = None, limit: int = 100) -> list[dict]:
+        query = "SELECT * FROM jobs"
+        params: tuple = ()
+        if statuses:
+            query += f" WHERE status IN ({','.join('?' * len(statuses))})"
+            params = statuses
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (*params, limit)).fetchall()
+        return [_to_dict(r) for r in rows]
+
+    def set_status(
+        self,
+        job_id: str,
+        status: str,
+        result: dict | None = None,
+        error: str | None = None
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, _now(), job_id)
+            )
+
+    def set_progress(self, job_id: str, stage: str, done: int, total: int) -> None:
+        with self._lock:
+            row = self._conn.execute("SELECT progress FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            progress = json.loads(row["progress"])
+            progress[stage] = {"done": done, "total": total}
+            self._conn.execute(
+                "UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(progress), _now(), job_id)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _to_dict(row: sqlite3.Row) -> dict:
+    job = dict(row)
+    job["options"] = json.loads(job["options"])
+    job["progress"] = json.loads(job["progress"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+async def init_job_store() -> JobStore:
+    global _store
+    settings = get_settings()
+    _store = JobStore(settings.ingest_job_db_path)
+    return _store
+
+
+async def get_job_store() -> JobStore:
+    return _store
+
+
+async def close_job_store() -> None:
+    if _store:
+        _store.close()
@@ -1,7 +1,24 @@
 from qdrant_client import AsyncQdrantClient
-from qdrant_client.models import Distance, VectorParams
+from qdrant_client.models import (
+    CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation, Distance,
+    Modifier, PayloadSchemaType, PointStruct, SparseVectorParams, VectorParams
+)
+from services.sparse_encoder import encode_document
 from config import get_settings
 
+# Points carry two named vectors: the Vertex embedding and a local BM25
+# sparse vector (services/sparse_encoder.py). qdrant_collection_name is an
+# alias onto the physical collection, so the schema can move to a new
+# collection without changing any caller.
+DENSE_VECTOR = "dense"
+SPARSE_VECTOR = "sparse"
+_SCHEMA_SUFFIX = "_hybrid"
+_MIGRATION_BATCH = 256
+
+# Keyword indexes for the payload fields queries filter on: asset_tag for
+# tag-scoped retrieval, source_file for re-ingestion scrolls and deletes.
+_KEYWORD_INDEXES = ("asset_tag", "source_file")
+
 _client: AsyncQdrantClient | None = None
 
 
@@ -17,15 +34,92 @@ async def init_qdrant() -> AsyncQdrantClient:
 
 
 async def _ensure_collection(client: AsyncQdrantClient, settings) -> None:
-    exists = await client.collection_exists(settings.qdrant_collection_name)
-    if not exists:
-        await client.create_collection(
-            collection_name=settings.qdrant_collection_name,
-            vectors_config=VectorParams(
-                size=settings.qdrant_vector_size,
-                distance=Distance.COSINE
+    alias = settings.qdrant_collection_name
+    current = await _alias_target(client, alias)
+    if current is None and await client.collection_exists(alias):
+        current = alias  # created before collections were aliased
+
+    if current and await _has_named_vectors(client, current):
+        target = current
+    else:
+        target = alias + _SCHEMA_SUFFIX
+        if not await client.collection_exists(target):
+            await client.create_collection(
+                collection_name=target,
+                vectors_config={
+                    DENSE_VECTOR: VectorParams(size=settings.qdrant_vector_size, distance=Distance.COSINE)
+                },
+                sparse_vectors_config={SPARSE_VECTOR: SparseVectorParams(modifier=Modifier.IDF)}
             )
+        if current:
+            copied = await _copy_points(client, current, target)
+            print(f"[Paper Brain] Migrated {copied} points from '{current}' to '{target}' (dense + sparse vectors)")
+        await _point_alias(client, alias, current, target)
+
+    # Creating an index that already exists is a no-op, so existing
+    # collections pick these up on the next startup.
+    for field in _KEYWORD_INDEXES:
+        await client.create_payload_index(
+            collection_name=target,
+            field_name=field,
+            field_schema=PayloadSchemaType.KEYWORD
+        )
+
+
+async def _alias_target(client: AsyncQdrantClient, alias: str) -> str | None:
+    aliases = await client.get_aliases()
+    return next((a.collection_name for a in aliases.aliases if a.alias_name == alias), None)
+
+
+async def _has_named_vectors(client: AsyncQdrantClient, collection: str) -> bool:
+    info = await client.get_collection(collection)
+    vectors = info.config.params.vectors
+    return isinstance(vectors, dict) and DENSE_VECTOR in vectors
+
+
+async def _copy_points(client: AsyncQdrantClient, source: str, target: str) -> int:
+    # Re-running after an interrupted copy is safe: upserts keep point ids.
+    copied, offset = 0, None
+    while True:
+        records, offset = await client.scroll(
+            collection_name=source,
+            limit=_MIGRATION_BATCH,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
         )
+        if records:
+            await client.upsert(
+                collection_name=target,
+                points=[
+                    PointStruct(
+                        id=r.id,
+                        vector={
+                            DENSE_VECTOR: r.vector,
+                            SPARSE_VECTOR: encode_document(r.payload.get("chunk_text", ""))
+                        },
+                        payload=r.payload
+                    )
+                    for r in records
+                ],
+                wait=True
+            )
+            copied += len(records)
+        if offset is None:
+            return copied
+
+
+async def _point_alias(client: AsyncQdrantClient, alias: str, current: str | None, target: str) -> None:
+    if current == alias:
+        # A collection and an alias can't share a name; the old collection
+        # has been copied by now, so it goes first.
+        await client.delete_collection(alias)
+    operations = [CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=alias))]
+    if current and current != alias:
+        operations.insert(0, DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+    await client.update_collection_aliases(change_aliases_operations=operations)
+    if current and current != alias:
+        await client.delete_collection(current)
 
 
 async def get_qdrant_client() -> AsyncQdrantClient:
@@ -0,0 +1,161 @@
+import time
+from array import array
+from collections import deque
+from database.neo4j_client import get_driver
+
+# In-process mirror of the CONNECTED_TO topology. Assets are numbered 0..n-1
+# and each direction is stored in CSR form: the neighbours of asset i are
+# targets[offsets[i]:offsets[i + 1]]. A TopologyGraph is immutable; writes
+# build a new one and swap the module reference, so readers never lock.
+
+DOWNSTREAM = "downstream"
+UPSTREAM = "upstream"
+
+
+class TopologyGraph:
+
+    def __init__(self, assets: dict[str, dict], edges: set[tuple[str, str]], version: int = 0):
+        # assets: tag_number -> properties; edges: (source_tag, target_tag).
+        self.version = version
+        self.assets = assets
+        self.edges = edges
+        self.tags = sorted(set(assets) | {tag for edge in edges for tag in edge})
+        self.index = {tag: i for i, tag in enumerate(self.tags)}
+        pairs = [(self.index[s], self.index[t]) for s, t in edges]
+        self._csr = {
+            DOWNSTREAM: _csr(len(self.tags), pairs),
+            UPSTREAM: _csr(len(self.tags), [(t, s) for s, t in pairs]),
+        }
+
+    def __contains__(self, tag: str) -> bool:
+        return tag in self.index
+
+    def neighbours(self, node: int, direction: str) -> array:
+        offsets, targets = self._csr[direction]
+        return targets[offsets[node]:offsets[node + 1]]
+
+    def degree(self, node: int, direction: str) -> int:
+        offsets, _ = self._csr[direction]
+        return offsets[node + 1] - offsets[node]
+
+    def reachable(self, tag: str, direction: str, max_depth: int | None = None) -> dict[str, int]:
+        # Every asset reachable from tag, with its hop distance (BFS order).
+        start = self.index.get(tag)
+        if start is None:
+            return {}
+        offsets, targets = self._csr[direction]
+        hops = {start: 0}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            depth = hops[node] + 1
+            if max_depth is not None and depth > max_depth:
+                continue
+            for i in range(offsets[node], offsets[node + 1]):
+                nxt = targets[i]
+                if nxt not in hops:
+                    hops[nxt] = depth
+                    queue.append(nxt)
+        del hops[start]
+        return {self.tags[node]: depth for node, depth in hops.items()}
+
+    def paths(self, tag: str, direction: str, max_depth: int, max_fanout: int, max_paths: int) -> list[list[str]]:
+        # Same shape as the Cypher cascade query: the max_paths shortest
+        # simple paths walking away from tag, never expanding through an
+        # asset with more than max_fanout neighbours in that direction.
+        start = self.index.get(tag)
+        if start is None:
+            return []
+        found: list[tuple[int, ...]] = []
+        frontier = deque([(start,)])
+        while frontier and len(found) < max_paths:
+            path = frontier.popleft()
+            node = path[-1]
+            if len(path) > 1 and self.degree(node, direction) > max_fanout:
+                continue
+            for nxt in self.neighbours(node, direction):
+                if nxt in path:
+                    continue
+                extended = path + (nxt,)
+                found.append(extended)
+                if len(found) == max_paths:
+                    break
+                if len(extended) <= max_depth:
+                    frontier.append(extended)
+        return [[self.tags[node] for node in path] for path in found]
+
+    def stats(self) -> dict:
+        return {"version": self.version, "assets": len(self.tags), "edges": len(self.edges)}
+
+
+def _csr(size: int, pairs: list[tuple[int, int]]) -> tuple[array, array]:
+    counts = [0] * (size + 1)
+    for source, _ in pairs:
+        counts[source + 1] += 1
+    for i in range(size):
+        counts[i + 1] += counts[i]
+    offsets = array("i", counts)
+    targets = array("i", [0] * len(pairs))
+    cursor = counts[:-1]
+    for source, target in sorted(pairs):
+        targets[cursor[source]] = target
+        cursor[source] += 1
+    return offsets, targets
+
+
+_topology: TopologyGraph | None = None
+
+
+async def load_topology() -> TopologyGraph:
+    # Full rebuild from Neo4j; called at startup.
+    global _topology
+    started = time.perf_counter()
+    driver = await get_driver()
+    async with driver.session() as session:
+        result = await session.run(
+            """
+            MATCH (a:Asset) WHERE a.tag_number IS NOT NULL
+            RETURN a.tag_number AS tag, properties(a) AS props
+            """
+        )
+        assets = {record["tag"]: record["props"] async for record in result}
+        result = await session.run(
+            """
+            MATCH (a:Asset)-[:CONNECTED_TO]->(b:Asset)
+            WHERE a.tag_number IS NOT NULL AND b.tag_number IS NOT NULL
+            RETURN DISTINCT a.tag_number AS source, b.tag_number AS target
+            """
+        )
+        edges = {(record["source"], record["target"]) async for record in result}
+    _topology = TopologyGraph(assets, edges, version=(_topology.version + 1) if _topology else 1)
+    print(
+        f"[Paper Brain] Topology mirror loaded: {len(_topology.tags)} assets, {len(edges)} connections "
+        f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+    )
+    return _topology
+
+
+def apply_topology_changes(
+    assets: dict[str, dict] | None = None,
+    edges: set[tuple[str, str]] = frozenset(),
+    removed_edges: set[tuple[str, str]] = frozenset()
+) -> TopologyGraph | None:
+    # Folds writes the caller already committed to Neo4j into the mirror
+    # without re-reading the graph. No-op until load_topology has run.
+    global _topology
+    if _topology is None:
+        return None
+    merged_assets = dict(_topology.assets)
+    for tag, props in (assets or {}).items():
+        merged_assets[tag] = {**merged_assets.get(tag, {}), **props}
+    merged_edges = (_topology.edges - set(removed_edges)) | set(edges)
+    _topology = TopologyGraph(merged_assets, merged_edges, version=_topology.version + 1)
+    return _topology
+
+
+def get_topology() -> TopologyGraph | None:
+    return _topology
+
+
+def topology_stats() -> dict:
+    return _topology.stats() if _topology else {"loaded": False}
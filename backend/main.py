@@ -5,8 +5,15 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from database.neo4j_client import init_driver, close_driver, get_driver
 from database.qdrant_client import init_qdrant, get_qdrant_client, close_qdrant
+from database.topology_cache import load_topology
+from database.job_store import init_job_store, close_job_store
+from pipelines.job_queue import start_job_workers, stop_job_workers
+from pipelines.voice_pipeline import refresh_asset_matcher
+from services.embedding_service import close_embedding_cache
+from services.google_clients import init_google_clients, close_google_clients
+from middleware import UploadLimitMiddleware
 from config import get_settings
-from routers import ingest, query, graph, seed
+from routers import ingest, query, graph, seed, metrics
 from models.schemas import HealthResponse
 
 
@@ -15,10 +22,25 @@ async def lifespan(app: FastAPI):
     settings = get_settings()
     await init_driver()
     await init_qdrant()
+    try:
+        await refresh_asset_matcher()
+    except Exception as e:
+        print(f"[Paper Brain] Asset dictionary not loaded, voice NER uses the LLM only: {e}")
+    try:
+        await load_topology()
+    except Exception as e:
+        print(f"[Paper Brain] Topology mirror not loaded, /graph/impact unavailable: {e}")
+    await init_google_clients()
+    await init_job_store()
+    await start_job_workers()
     print(f"[Paper Brain] All services initialized. Environment: {settings.environment}")
     yield
+    await stop_job_workers()
+    await close_job_store()
     await close_driver()
     await close_qdrant()
+    await close_google_clients()
+    close_embedding_cache()
     print("[Paper Brain] Shutdown complete.")
 
 
@@ -29,6 +51,15 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        "/ingest/document": get_settings().max_document_upload_bytes,
+        "/ingest/voice": get_settings().max_voice_upload_bytes,
+        "/ingest/voice/batch": get_settings().max_voice_upload_bytes * get_settings().max_voice_batch_files,
+    }
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
@@ -41,6 +72,7 @@ app.include_router(ingest.router)
 app.include_router(query.router)
 app.include_router(graph.router)
 app.include_router(seed.router)
+app.include_router(metrics.router)
 
 
 @app.get("/health", response_model=HealthResponse, tags=["health"])
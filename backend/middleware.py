@@ -0,0 +1,54 @@
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Room for multipart boundaries and form fields on top of the file itself.
+_MULTIPART_SLACK_BYTES = 64 * 1024
+
+
+class UploadLimitMiddleware:
+    # Rejects request bodies over a per-path limit as they stream in, before
+    # the multipart parser has spooled the whole upload. A declared
+    # Content-Length over the limit is refused without reading the body.
+
+    def __init__(self, app: ASGIApp, limits: dict[str, int]):
+        self.app = app
+        self.limits = {path: limit + _MULTIPART_SLACK_BYTES for path, limit in limits.items()}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        declared = headers.get(b"content-length")
+        if declared and declared.isdigit() and int(declared) > limit:
+            await _send_too_large(send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail="Upload too large.")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def _send_too_large(send: Send) -> None:
+    body = b'{"detail":"Upload too large."}'
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"connection", b"close"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -15,15 +15,43 @@ class QueryResponse(BaseModel):
     route_taken: str
     sources: list[str]
     latency_ms: float
+    cached: bool = False  # served from the semantic answer cache
 
 
 class IngestDocumentResponse(BaseModel):
     filename: str
     chunks_stored: int
+    chunks_skipped: int = 0
+    chunks_deleted: int = 0  # stale chunks removed by a re-ingest
     assets_linked: int
     message: str
 
 
+class IngestJobResponse(BaseModel):
+    job_id: str
+    status: str
+    filename: str
+    message: str
+
+
+class StageProgress(BaseModel):
+    done: int
+    total: int
+
+
+class IngestJobStatus(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    filename: str
+    asset_tag: Optional[str] = None
+    progress: dict[str, StageProgress]
+    result: Optional[IngestDocumentResponse] = None
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+
+
 class IngestVoiceResponse(BaseModel):
     observation_id: str
     transcript: str
@@ -51,6 +79,19 @@ class AssetGraphResponse(BaseModel):
     document_sources: list[str]
 
 
+class ImpactedAsset(BaseModel):
+    tag_number: str
+    hops: int
+
+
+class AssetImpactResponse(BaseModel):
+    tag_number: str
+    downstream: list[ImpactedAsset]  # assets that lose supply if this one fails
+    upstream: list[ImpactedAsset]    # assets this one depends on
+    topology_version: int
+    elapsed_us: float
+
+
 class SeedResponse(BaseModel):
     assets_created: int
     relationships_created: int
@@ -63,3 +104,20 @@ class HealthResponse(BaseModel):
     qdrant: bool
     gemini: bool
     timestamp: str
+
+
+class VoiceBatchItem(BaseModel):
+    filename: str
+    status: str  # "stored" or "failed"
+    observation_id: Optional[str] = None
+    transcript: str = ""
+    asset_linked: Optional[str] = None
+    extracted: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class IngestVoiceBatchResponse(BaseModel):
+    results: list[VoiceBatchItem]
+    stored: int
+    failed: int
+    message: str
@@ -1,10 +1,18 @@
+import asyncio
 import re
-from typing import TypedDict, Literal
+from contextlib import aclosing
+from typing import AsyncIterator, TypedDict, Literal
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
-from services.gemini_service import chat_complete
-from services.embedding_service import embed_text
-from database.qdrant_client import get_qdrant_client
+from qdrant_client.models import FieldCondition, Filter, Fusion, FusionQuery, MatchAny, Prefetch, SparseVector
+from services.gemini_service import chat_complete, chat_complete_stream
+from services.embedding_service import embed_text, estimate_tokens, normalize_query
+from services.sparse_encoder import encode_query
+from services.context_fusion import drop_near_duplicates, fit_to_budget, merge_adjacent_chunks, split_budget
+from services.answer_cache import ANY_ASSET, get_answer_cache
+from database.qdrant_client import DENSE_VECTOR, SPARSE_VECTOR, get_qdrant_client
 from database.neo4j_client import get_driver
+from database.topology_cache import DOWNSTREAM, UPSTREAM, TopologyGraph, get_topology
 from config import get_settings
 
 STRUCTURAL_KEYWORDS = [
@@ -19,6 +27,11 @@ FACTUAL_KEYWORDS = [
     "how to", "what is", "describe"
 ]
 TAG_PATTERN = re.compile(r'\b([A-Z]{1,6}-\d{1,4})\b')
+VECTOR_TOP_K = 5
+NO_CONTEXT_ANSWER = (
+    "I don't have enough information in the knowledge base to answer this question. "
+    "Please ingest relevant documents first."
+)
 
 
 class GraphRAGState(TypedDict):
@@ -31,74 +44,124 @@ class GraphRAGState(TypedDict):
     sources: list[str]
 
 
-async def classify_query(state: GraphRAGState) -> GraphRAGState:
-    query_lower = state["query"].lower()
+# Nodes return only the keys they change: on the hybrid route both retrieval
+# nodes run in the same step, and LangGraph merges their partial updates.
+
+def route_query(query: str) -> str:
+    query_lower = query.lower()
     has_structural = any(kw in query_lower for kw in STRUCTURAL_KEYWORDS)
     has_factual = any(kw in query_lower for kw in FACTUAL_KEYWORDS)
 
     if has_structural and has_factual:
-        route = "hybrid"
-    elif has_structural:
-        route = "graph"
-    else:
-        route = "vector"
+        return "hybrid"
+    if has_structural:
+        return "graph"
+    return "vector"
+
+
+def mentioned_tags(query: str) -> list[str]:
+    return TAG_PATTERN.findall(query.upper())
+
 
-    return {**state, "route": route}
+def _known_tags(query: str) -> list[str]:
+    # Tags that match TAG_PATTERN but aren't assets (model numbers like
+    # XR-900) would only cost a wasted filtered search.
+    tags = list(dict.fromkeys(mentioned_tags(query)))
+    topology = get_topology()
+    return [tag for tag in tags if tag in topology] if topology is not None else tags
 
 
-async def retrieve_from_qdrant(state: GraphRAGState) -> GraphRAGState:
-    query_vector = await embed_text(state["query"])
+async def classify_query(state: GraphRAGState) -> dict:
+    return {"route": route_query(state["query"])}
+
+
+async def retrieve_from_qdrant(state: GraphRAGState, config: RunnableConfig | None = None) -> dict:
+    # run_query may have started the embedding before routing (speculative mode).
+    speculative = ((config or {}).get("configurable") or {}).get("query_vector")
+    query_vector = await speculative if speculative else await embed_text(state["query"])
     client = await get_qdrant_client()
     settings = get_settings()
 
-    response = await client.query_points(
-        collection_name=settings.qdrant_collection_name,
-        query=query_vector,
-        limit=5,
-        with_payload=True
-    )
+    tags = _known_tags(state["query"]) if settings.graphrag_tag_filtered_search else []
+    sparse_vector = encode_query(state["query"]) if settings.qdrant_hybrid_search else None
+    points = []
+    if tags:
+        # Chunks documented against the asked-about assets first, through the
+        # asset_tag keyword index; the unfiltered search below tops up.
+        tag_filter = Filter(must=[FieldCondition(key="asset_tag", match=MatchAny(any=tags))])
+        points = await _search_chunks(client, query_vector, sparse_vector, tag_filter)
+    if len(points) < VECTOR_TOP_K:
+        seen = {p.id for p in points}
+        unfiltered = await _search_chunks(client, query_vector, sparse_vector)
+        points += [p for p in unfiltered if p.id not in seen][:VECTOR_TOP_K - len(points)]
 
     vector_results = [
         {
             "chunk_text": r.payload.get("chunk_text", ""),
             "source_file": r.payload.get("source_file", ""),
             "page_number": r.payload.get("page_number"),
+            "chunk_index": r.payload.get("chunk_index"),
             "score": r.score
         }
-        for r in response.points
+        for r in points
     ]
-    return {**state, "vector_results": vector_results}
+    return {"vector_results": vector_results}
+
+
+async def _search_chunks(
+    client,
+    dense_vector: list[float],
+    sparse_vector: SparseVector | None,
+    query_filter: Filter | None = None
+) -> list:
+    # Dense and sparse candidates are fetched side by side in one request and
+    # merged with reciprocal rank fusion; scores are then RRF, not cosine.
+    settings = get_settings()
+    if sparse_vector is None or not sparse_vector.indices:
+        response = await client.query_points(
+            collection_name=settings.qdrant_collection_name,
+            query=dense_vector,
+            using=DENSE_VECTOR,
+            query_filter=query_filter,
+            limit=VECTOR_TOP_K,
+            with_payload=True
+        )
+        return response.points
+    response = await client.query_points(
+        collection_name=settings.qdrant_collection_name,
+        prefetch=[
+            Prefetch(query=dense_vector, using=DENSE_VECTOR, filter=query_filter, limit=settings.qdrant_prefetch_limit),
+            Prefetch(query=sparse_vector, using=SPARSE_VECTOR, filter=query_filter, limit=settings.qdrant_prefetch_limit),
+        ],
+        query=FusionQuery(fusion=Fusion.RRF),
+        limit=VECTOR_TOP_K,
+        with_payload=True
+    )
+    return response.points
 
 
-async def retrieve_from_neo4j(state: GraphRAGState) -> GraphRAGState:
-    mentioned_tags = TAG_PATTERN.findall(state["query"].upper())
+async def retrieve_from_neo4j(state: GraphRAGState) -> dict:
+    tags = list(dict.fromkeys(mentioned_tags(state["query"])))
+    settings = get_settings()
+    topology = get_topology()
+    if settings.graph_backend == "memory" and topology is not None:
+        return {"graph_results": await _retrieve_from_topology(topology, tags)}
+
     driver = await get_driver()
     graph_results = []
 
     async with driver.session() as session:
-        if mentioned_tags:
-            for tag in mentioned_tags[:3]:
-                result = await session.run(
-                    """
-                    MATCH (a:Asset {tag_number: $tag})
-                    OPTIONAL MATCH (upstream:Asset)-[:CONNECTED_TO]->(a)
-                    OPTIONAL MATCH (a)-[:CONNECTED_TO]->(downstream:Asset)
-                    OPTIONAL MATCH (a)-[:HAS_OBSERVATION]->(o:KnowledgeObservation)
-                    RETURN a,
-                           collect(DISTINCT upstream.tag_number) as upstream_assets,
-                           collect(DISTINCT downstream.tag_number) as downstream_assets,
-                           collect(DISTINCT {issue: o.observed_issue, action: o.mitigation_action}) as observations
-                    """,
-                    tag=tag
-                )
-                record = await result.single()
-                if record and record["a"]:
-                    graph_results.append({
-                        "asset": dict(record["a"]),
-                        "upstream_assets": [t for t in record["upstream_assets"] if t],
-                        "downstream_assets": [t for t in record["downstream_assets"] if t],
-                        "observations": [o for o in record["observations"] if o.get("issue")]
-                    })
+        if tags:
+            result = await session.run(
+                _cascade_query(settings.graph_cascade_depth),
+                tags=tags,
+                max_fanout=settings.graph_max_fanout,
+                max_paths=settings.graph_max_paths
+            )
+            async for record in result:
+                graph_results.append(_graph_result(
+                    dict(record["a"]), record["downstream_paths"], record["upstream_paths"], record["observations"]
+                ))
         else:
             result = await session.run(
                 """
@@ -110,83 +173,221 @@ async def retrieve_from_neo4j(state: GraphRAGState) -> GraphRAGState:
             async for record in result:
                 graph_results.append(dict(record))
 
-    return {**state, "graph_results": graph_results}
+    return {"graph_results": graph_results}
 
 
-async def fuse_context(state: GraphRAGState) -> GraphRAGState:
-    context_parts = []
-    sources = []
+async def _retrieve_from_topology(topology: TopologyGraph, tags: list[str]) -> list[dict]:
+    # Paths come from the in-process mirror; Neo4j is only asked for the
+    # observations, which change with every voice note. Like the Cypher
+    # path, the 20-edge listing is only for questions that name no tag;
+    # named but unknown tags give no graph context.
+    if not tags:
+        return [{"source": s, "target": t} for s, t in sorted(topology.edges)[:20]]
+    tags = [tag for tag in tags if tag in topology]
+    if not tags:
+        return []
 
-    if state["vector_results"]:
-        context_parts.append("=== DOCUMENT KNOWLEDGE ===")
-        for r in state["vector_results"]:
-            context_parts.append(f"[Source: {r['source_file']}, Page {r['page_number']}]")
-            context_parts.append(r["chunk_text"])
-            if r["source_file"]:
-                sources.append(f"{r['source_file']} (page {r['page_number']})")
+    driver = await get_driver()
+    async with driver.session() as session:
+        result = await session.run(
+            """
+            UNWIND $tags AS tag
+            MATCH (:Asset {tag_number: tag})-[:HAS_OBSERVATION]->(o:KnowledgeObservation)
+            RETURN tag, collect(DISTINCT {issue: o.observed_issue, action: o.mitigation_action}) AS observations
+            """,
+            tags=tags
+        )
+        observations = {record["tag"]: record["observations"] async for record in result}
+
+    settings = get_settings()
+    limits = (settings.graph_cascade_depth, settings.graph_max_fanout, settings.graph_max_paths)
+    return [
+        _graph_result(
+            topology.assets.get(tag) or {"tag_number": tag},
+            topology.paths(tag, DOWNSTREAM, *limits),
+            topology.paths(tag, UPSTREAM, *limits),
+            observations.get(tag, [])
+        )
+        for tag in tags
+    ]
+
+
+def _graph_result(asset: dict, downstream_paths: list, upstream_paths: list, observations: list) -> dict:
+    downstream = _maximal_paths(downstream_paths)
+    # Upstream paths are walked away from the asset; flip them so every
+    # path reads in flow direction and ends at the asset.
+    upstream = [path[::-1] for path in _maximal_paths(upstream_paths)]
+    return {
+        "asset": asset,
+        "upstream_assets": list(dict.fromkeys(path[-2] for path in upstream)),
+        "downstream_assets": list(dict.fromkeys(path[1] for path in downstream)),
+        "upstream_paths": upstream,
+        "downstream_paths": downstream,
+        "observations": [o for o in observations if o.get("issue")]
+    }
+
+
+def _cascade_query(depth: int) -> str:
+    # One round trip for every mentioned tag. Paths are grown one hop at a
+    # time, so a hop only extends the paths the previous hop kept: each hop
+    # keeps at most $max_paths, and hubs (more than $max_fanout connections
+    # in the walk direction) end a path instead of being expanded. A single
+    # *1..depth pattern would enumerate every path before any of the limits
+    # applied. Same walk as TopologyGraph.paths; depth is formatted in.
+    return f"""
+    UNWIND $tags AS tag
+    MATCH (a:Asset {{tag_number: tag}})
+    CALL {{
+        WITH a
+        {_expand_hops("(n)-[:CONNECTED_TO]->(m:Asset)", "(n)-[:CONNECTED_TO]->()", depth)}
+        RETURN [path IN found[..$max_paths] | [n IN path | n.tag_number]] AS downstream_paths
+    }}
+    CALL {{
+        WITH a
+        {_expand_hops("(n)<-[:CONNECTED_TO]-(m:Asset)", "(n)<-[:CONNECTED_TO]-()", depth)}
+        RETURN [path IN found[..$max_paths] | [n IN path | n.tag_number]] AS upstream_paths
+    }}
+    CALL {{
+        WITH a
+        OPTIONAL MATCH (a)-[:HAS_OBSERVATION]->(o:KnowledgeObservation)
+        RETURN collect(DISTINCT {{issue: o.observed_issue, action: o.mitigation_action}}) AS observations
+    }}
+    RETURN a, downstream_paths, upstream_paths, observations
+    """
+
+
+def _expand_hops(step: str, degree: str, depth: int) -> str:
+    # Unrolled breadth-first walk from `a`: `frontier` holds the paths the
+    # last hop produced, `found` every path so far, shortest first.
+    hop = f"""
+        CALL {{
+            WITH frontier
+            UNWIND frontier AS path
+            WITH path, last(path) AS n
+            WHERE size(path) = 1 OR COUNT {{ {degree} }} <= $max_fanout
+            MATCH {step}
+            WHERE NOT m IN path
+            WITH path + m AS extended
+            LIMIT $max_paths
+            RETURN collect(extended) AS next
+        }}
+        WITH next AS frontier, found + next AS found"""
+    return "WITH [[a]] AS frontier, [] AS found" + hop * max(1, int(depth))
+
+
+def _maximal_paths(paths: list[list[str]]) -> list[list[str]]:
+    # Cascade paths include every prefix (V-20→P-101 and
+    # V-20→P-101→B-04); keep only paths no other path extends, in order.
+    prefixes = {tuple(path[:i]) for path in paths for i in range(1, len(path))}
+    return [path for path in paths if tuple(path) not in prefixes]
+
+
+async def fuse_context(state: GraphRAGState) -> dict:
+    settings = get_settings()
+    passages = drop_near_duplicates(
+        merge_adjacent_chunks(state["vector_results"]), settings.context_dedup_overlap
+    )
+    document_blocks = [
+        f"[Source: {p['source_file']}, Page {p['page_number']}]\n{p['chunk_text']}" for p in passages
+    ]
+    graph_blocks = [_topology_block(r) for r in state["graph_results"]]
 
-    if state["graph_results"]:
+    document_budget, graph_budget = split_budget(
+        settings.context_token_budget,
+        settings.context_graph_share,
+        sum(estimate_tokens(b) for b in document_blocks),
+        sum(estimate_tokens(b) for b in graph_blocks)
+    )
+    document_blocks, document_tokens = fit_to_budget(document_blocks, document_budget)
+    graph_blocks, graph_tokens = fit_to_budget(graph_blocks, graph_budget)
+
+    context_parts = []
+    if document_blocks:
+        context_parts.append("=== DOCUMENT KNOWLEDGE ===")
+        context_parts.extend(document_blocks)
+    if graph_blocks:
         context_parts.append("\n=== ASSET TOPOLOGY & OBSERVATIONS ===")
-        for r in state["graph_results"]:
-            if "asset" in r:
-                a = r["asset"]
-                lines = [
-                    f"Asset: {a.get('tag_number')} ({a.get('id', '')}) — {a.get('manufacturer', '')} {a.get('model_number', '')}",
-                ]
-                if r.get("upstream_assets"):
-                    lines.append(f"  Feeds FROM (upstream assets that supply this asset): {', '.join(r['upstream_assets'])}")
-                if r.get("downstream_assets"):
-                    lines.append(f"  Feeds INTO (downstream assets that depend on this asset): {', '.join(r['downstream_assets'])}")
-                if not r.get("upstream_assets") and not r.get("downstream_assets"):
-                    lines.append("  No connected assets found.")
-                for obs in r.get("observations", []):
-                    lines.append(f"  Known issue: {obs.get('issue', '')}")
-                    if obs.get("action"):
-                        lines.append(f"  Resolution: {obs.get('action', '')}")
-                context_parts.append("\n".join(lines))
-            else:
-                context_parts.append(f"  {r.get('source')} --> {r.get('target')}")
-
-    return {**state, "fused_context": "\n".join(context_parts), "sources": list(set(sources))}
-
-
-async def synthesize_answer(state: GraphRAGState) -> GraphRAGState:
+        context_parts.extend(graph_blocks)
+
+    sources = [
+        f"{p['source_file']} (page {p['page_number']})"
+        for p in passages[:len(document_blocks)] if p["source_file"]
+    ]
+    raw_tokens = sum(estimate_tokens(r["chunk_text"]) for r in state["vector_results"])
+    print(
+        f"[Paper Brain] Context: {len(state['vector_results'])} chunks -> {len(document_blocks)} passages, "
+        f"~{document_tokens + graph_tokens} tokens (documents {document_tokens}/{document_budget}, "
+        f"topology {graph_tokens}/{graph_budget}; raw chunks ~{raw_tokens})"
+    )
+    return {"fused_context": "\n".join(context_parts), "sources": list(dict.fromkeys(sources))}
+
+
+def _topology_block(r: dict) -> str:
+    if "asset" not in r:
+        return f"  {r.get('source')} --> {r.get('target')}"
+    a = r["asset"]
+    lines = [
+        f"Asset: {a.get('tag_number')} ({a.get('id', '')}) — {a.get('manufacturer', '')} {a.get('model_number', '')}",
+    ]
+    if r.get("upstream_assets"):
+        lines.append(f"  Feeds FROM (upstream assets that supply this asset): {', '.join(r['upstream_assets'])}")
+    if r.get("downstream_assets"):
+        lines.append(f"  Feeds INTO (downstream assets that depend on this asset): {', '.join(r['downstream_assets'])}")
+    for path in r.get("upstream_paths", []):
+        if len(path) > 2:
+            lines.append(f"  Supply chain: {' → '.join(path)}")
+    for path in r.get("downstream_paths", []):
+        if len(path) > 2:
+            lines.append(f"  Failure cascade: {' → '.join(path)}")
+    if not r.get("upstream_assets") and not r.get("downstream_assets"):
+        lines.append("  No connected assets found.")
+    for obs in r.get("observations", []):
+        lines.append(f"  Known issue: {obs.get('issue', '')}")
+        if obs.get("action"):
+            lines.append(f"  Resolution: {obs.get('action', '')}")
+    return "\n".join(lines)
+
+
+async def synthesize_answer(state: GraphRAGState) -> dict:
     if not state["fused_context"].strip():
-        return {**state, "answer": "I don't have enough information in the knowledge base to answer this question. Please ingest relevant documents first."}
+        return {"answer": NO_CONTEXT_ANSWER}
+    answer = await chat_complete(build_answer_prompt(state["query"], state["fused_context"]))
+    return {"answer": answer}
 
-    prompt = f"""You are Paper Brain, an industrial knowledge intelligence assistant for a manufacturing plant.
+
+def build_answer_prompt(query: str, fused_context: str) -> str:
+    # Shared by synthesize_answer and the streaming path in stream_query.
+    return f"""You are Paper Brain, an industrial knowledge intelligence assistant for a manufacturing plant.
 
 Answer the following question using ONLY the context provided below.
 If the answer is not in the context, say "I don't have enough information in the knowledge base to answer this."
 Always cite sources when available. Be concise and direct.
 
 CONTEXT:
-{state["fused_context"]}
+{fused_context}
 
-QUESTION: {state["query"]}
+QUESTION: {query}
 
 ANSWER:"""
 
-    answer = await chat_complete(prompt)
-    return {**state, "answer": answer}
-
 
-def _route_after_classify(state: GraphRAGState) -> str:
+def _route_after_classify(state: GraphRAGState) -> str | list[str]:
+    # Hybrid fans out to both stores at once; fuse_context runs once both finish.
+    if state["route"] == "hybrid":
+        return ["vector", "graph"]
     return state["route"]
 
 
-def _route_after_qdrant(state: GraphRAGState) -> str:
-    return "neo4j" if state["route"] == "hybrid" else "fuse"
-
-
 def _build_graph():
+    # Retrieval only: the graph stops after fuse_context. run_query and
+    # stream_query generate the answer once the answer cache has missed, so
+    # a cache hit never pays for a discarded Gemini call.
     graph = StateGraph(GraphRAGState)
 
     graph.add_node("classify_query", classify_query)
     graph.add_node("retrieve_from_qdrant", retrieve_from_qdrant)
     graph.add_node("retrieve_from_neo4j", retrieve_from_neo4j)
     graph.add_node("fuse_context", fuse_context)
-    graph.add_node("synthesize_answer", synthesize_answer)
 
     graph.set_entry_point("classify_query")
 
@@ -195,32 +396,114 @@ def _build_graph():
         _route_after_classify,
         {
             "vector": "retrieve_from_qdrant",
-            "graph": "retrieve_from_neo4j",
-            "hybrid": "retrieve_from_qdrant"
-        }
-    )
-
-    graph.add_conditional_edges(
-        "retrieve_from_qdrant",
-        _route_after_qdrant,
-        {
-            "neo4j": "retrieve_from_neo4j",
-            "fuse": "fuse_context"
+            "graph": "retrieve_from_neo4j"
         }
     )
 
+    graph.add_edge("retrieve_from_qdrant", "fuse_context")
     graph.add_edge("retrieve_from_neo4j", "fuse_context")
-    graph.add_edge("fuse_context", "synthesize_answer")
-    graph.add_edge("synthesize_answer", END)
+    graph.add_edge("fuse_context", END)
 
     return graph.compile()
 
 
-_graphrag_app = _build_graph()
+_retrieval_app = _build_graph()
+
+# Single-flight: identical questions arriving while one is being answered
+# wait for that execution instead of starting their own.
+_inflight: dict[str, asyncio.Task] = {}
+_flight_stats = {"executions": 0, "coalesced": 0}
 
 
 async def run_query(query: str) -> dict:
-    initial_state = GraphRAGState(
+    key = normalize_query(query)
+    task = _inflight.get(key)
+    if task is not None:
+        _flight_stats["coalesced"] += 1
+    else:
+        _flight_stats["executions"] += 1
+        task = asyncio.create_task(_run_query(query))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _inflight.pop(key) if _inflight.get(key) is t else None)
+    # shield: one caller disconnecting must not cancel the shared execution.
+    return {**await asyncio.shield(task)}
+
+
+def query_coalescing_stats() -> dict:
+    return {**_flight_stats, "in_flight": len(_inflight)}
+
+
+async def _run_query(query: str) -> dict:
+    cache = get_answer_cache()
+    tags = set(mentioned_tags(query))
+    cached, state, embedding = await _answer_or_run(query, cache, tags)
+    if cached:
+        return {**cached, "cached": True}
+    final_state = {**state, **await synthesize_answer(state)}
+
+    result = {
+        "answer": final_state["answer"],
+        "route_taken": final_state["route"],
+        "sources": final_state["sources"]
+    }
+    _remember_answer(cache, embedding, final_state, tags, result)
+    return {**result, "cached": False}
+
+
+# Streaming variant of run_query: yields ("route", ...) and ("sources", ...)
+# as soon as fuse_context is done, then ("token", ...) per Gemini chunk and
+# a final ("done", ...). Closing the generator closes the Gemini stream.
+async def stream_query(query: str) -> AsyncIterator[tuple[str, dict]]:
+    cache = get_answer_cache()
+    tags = set(mentioned_tags(query))
+    cached, state, embedding = await _answer_or_run(query, cache, tags)
+
+    if cached:
+        yield "route", {"route": cached["route_taken"]}
+        yield "sources", {"sources": cached["sources"]}
+        yield "token", {"text": cached["answer"]}
+        yield "done", {"cached": True}
+        return
+
+    yield "route", {"route": state["route"]}
+    yield "sources", {"sources": state["sources"]}
+    if not state["fused_context"].strip():
+        yield "token", {"text": NO_CONTEXT_ANSWER}
+        yield "done", {"cached": False}
+        return
+
+    parts = []
+    async with aclosing(chat_complete_stream(build_answer_prompt(query, state["fused_context"]))) as tokens:
+        async for text in tokens:
+            parts.append(text)
+            yield "token", {"text": text}
+
+    result = {"answer": "".join(parts), "route_taken": state["route"], "sources": state["sources"]}
+    _remember_answer(cache, embedding, state, tags, result)
+    yield "done", {"cached": False}
+
+
+async def _answer_or_run(query: str, cache, tags: set[str]) -> tuple[dict | None, GraphRAGState | None, asyncio.Task | None]:
+    # Retrieval starts right away, alongside the embedding the cache lookup
+    # needs, so a miss costs no extra round trip: the Neo4j branch never
+    # waits on the embedding and the Qdrant branch reuses it. A hit cancels
+    # retrieval. Returns (cached result, None, ...) or (None, state, ...).
+    embedding, config = _start_embedding(query, cache)
+    work = asyncio.create_task(_retrieval_app.ainvoke(_initial_state(query), config=config))
+    work.add_done_callback(lambda t: t.cancelled() or t.exception())
+    try:
+        cached = await _cached_answer(cache, embedding, route_query(query), tags)
+        if cached:
+            return cached, None, embedding
+        return None, await work, embedding
+    finally:
+        for task in (work, embedding):
+            if task and not task.done():
+                task.cancel()
+
+
+def _initial_state(query: str) -> GraphRAGState:
+    return GraphRAGState(
         query=query,
         route=None,
         vector_results=[],
@@ -229,9 +512,47 @@ async def run_query(query: str) -> dict:
         answer="",
         sources=[]
     )
-    final_state = await _graphrag_app.ainvoke(initial_state)
-    return {
-        "answer": final_state["answer"],
-        "route_taken": final_state["route"],
-        "sources": final_state["sources"]
-    }
+
+
+def _start_embedding(query: str, cache) -> tuple[asyncio.Task | None, dict]:
+    # Started before routing whenever something needs it early: the answer
+    # cache lookup or speculative mode. retrieve_from_qdrant reuses it, and
+    # callers cancel it if unused.
+    if not (cache or get_settings().graphrag_speculative_embedding):
+        return None, {}
+    embedding = asyncio.create_task(embed_text(query))
+    embedding.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return embedding, {"configurable": {"query_vector": embedding}}
+
+
+async def _cached_answer(cache, embedding: asyncio.Task | None, route: str, tags: set[str]) -> dict | None:
+    if not cache:
+        return None
+    try:
+        return cache.lookup(await embedding, route, tags)
+    except Exception:
+        return None  # embedding failed; the graph route may still answer
+
+
+def _remember_answer(cache, embedding: asyncio.Task | None, state: GraphRAGState, tags: set[str], result: dict) -> None:
+    # Answers with no context ("not enough information") aren't cached: the
+    # next ingestion may be exactly what they were missing.
+    if not cache or not state["fused_context"].strip():
+        return
+    if embedding.done() and not embedding.cancelled() and not embedding.exception():
+        sources, assets = _answer_dependencies(state, tags)
+        cache.put(embedding.result(), state["route"], tags, result, sources, assets)
+
+
+def _answer_dependencies(state: GraphRAGState, tags: set[str]) -> tuple[set[str], set[str]]:
+    sources = {r["source_file"] for r in state["vector_results"] if r["source_file"]}
+    assets = set(tags)
+    for r in state["graph_results"]:
+        if "asset" in r:
+            assets.add(r["asset"].get("tag_number"))
+            for path in r.get("upstream_paths", []) + r.get("downstream_paths", []):
+                assets.update(path)
+        else:
+            assets.add(ANY_ASSET)  # untargeted topology listing
+    assets.discard(None)
+    return sources, assets
@@ -1,84 +1,490 @@
+import asyncio
+import hashlib
 import uuid
-from qdrant_client.models import PointStruct
-from services.documentai_service import extract_text_from_pdf
+from typing import Awaitable, Callable
+from qdrant_client.models import (
+    FieldCondition, Filter, FilterSelector, HasIdCondition, MatchValue,
+    PointStruct, SetPayload, SetPayloadOperation
+)
+from services.documentai_service import read_pages, split_into_chunks
+from services.pdf_service import PdfSource, page_fingerprints
 from services.embedding_service import embed_texts
+from services.sparse_encoder import encode_document
+from services.answer_cache import invalidate_answers
 from database.neo4j_client import get_driver
-from database.qdrant_client import get_qdrant_client
+from database.qdrant_client import DENSE_VECTOR, SPARSE_VECTOR, get_qdrant_client
 from config import get_settings
 
+# Namespace for content-addressed DocumentChunk / Qdrant point ids.
+_CHUNK_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "paperbrain/document-chunk")
+
+# progress(stage, done, total) — stages are "ocr", "embed", "qdrant", "neo4j".
+ProgressCallback = Callable[[str, int, int], None]
+
 
 async def ingest_document(
-    pdf_bytes: bytes,
+    pdf_bytes: PdfSource,
     filename: str,
-    asset_tag: str | None = None
+    asset_tag: str | None = None,
+    progress: ProgressCallback | None = None
 ) -> dict:
-    chunks = await extract_text_from_pdf(pdf_bytes, filename)
+    loop = asyncio.get_event_loop()
+    fingerprints = await loop.run_in_executor(None, page_fingerprints, pdf_bytes)
+    pages = await read_pages(
+        pdf_bytes,
+        on_pages=lambda done, total: _report(progress, "ocr", done, total)
+    )
+    chunks = attach_page_hashes(split_into_chunks(pages, filename), fingerprints)
     if not chunks:
-        return {"chunks_stored": 0, "assets_linked": 0, "filename": filename}
+        return _result(filename, 0, 0, 0)
+
+    new_chunks, skipped = await select_new_chunks(chunks, asset_tag)
+    if not new_chunks:
+        return _result(filename, 0, skipped, 0)
+
+    vectors = await _embed_chunks([c["chunk_text"] for c in new_chunks], progress)
+    stored = await store_chunks(new_chunks, vectors, asset_tag, progress)
+    invalidate_answers(sources={filename}, assets={asset_tag})
+    return _result(filename, stored["chunks_stored"], skipped, stored["assets_linked"])
+
+
+# Re-ingests a revised upload of an already ingested `filename`. Pages whose
+# fingerprint matches the stored page_hash are not read again; changed pages
+# are re-read and only chunks whose text changed are embedded. Chunks that
+# disappeared (edited text, removed pages) are deleted from Qdrant and Neo4j
+# once the replacements are written. The upload's asset_tag applies to the
+# whole document: if it differs from the stored one, the chunks that are
+# kept are re-tagged in Qdrant and re-linked in Neo4j as well.
+async def reingest_document(
+    pdf_bytes: PdfSource,
+    filename: str,
+    asset_tag: str | None = None,
+    progress: ProgressCallback | None = None
+) -> dict:
+    loop = asyncio.get_event_loop()
+    fingerprints = await loop.run_in_executor(None, page_fingerprints, pdf_bytes)
+    stored_pages = await _stored_pages(filename)
+
+    changed = [
+        index for index, fingerprint in enumerate(fingerprints)
+        if stored_pages.get(index + 1, {}).get("hashes") != {fingerprint}
+    ]
+    chunks_by_id: dict[str, dict] = {}
+    if changed:
+        pages = await read_pages(
+            pdf_bytes,
+            pages=changed,
+            on_pages=lambda done, total: _report(progress, "ocr", done, total)
+        )
+        chunks_by_id = _assign_chunk_ids(attach_page_hashes(split_into_chunks(pages, filename), fingerprints))
+
+    previous_ids = set()
+    for page_number, entry in stored_pages.items():
+        if page_number > len(fingerprints) or page_number - 1 in changed:
+            previous_ids |= entry["ids"]
+    kept = [c for chunk_id, c in chunks_by_id.items() if chunk_id in previous_ids]
+    new_chunks = [c for chunk_id, c in chunks_by_id.items() if chunk_id not in previous_ids]
+    obsolete_ids = sorted(previous_ids - chunks_by_id.keys())
+
+    stored = {"chunks_stored": 0, "assets_linked": 0}
+    if new_chunks:
+        vectors = await _embed_chunks([c["chunk_text"] for c in new_chunks], progress)
+        stored = await store_chunks(new_chunks, vectors, asset_tag, progress)
+    if kept:
+        await _refresh_chunk_positions(kept)
+    if obsolete_ids:
+        await asyncio.gather(
+            _delete_points(filename, obsolete_ids),
+            _delete_chunks_from_neo4j(obsolete_ids)
+        )
+
+    previous_tags = {tag for entry in stored_pages.values() for tag in entry["tags"]}
+    retagged = previous_tags - {asset_tag}
+    if retagged:
+        reused_ids = sorted(
+            chunk_id for entry in stored_pages.values() for chunk_id in entry["ids"]
+            if chunk_id not in obsolete_ids
+        )
+        await asyncio.gather(
+            _retag_points(reused_ids, asset_tag),
+            _relink_chunks_in_neo4j(reused_ids, asset_tag)
+        )
+
+    if new_chunks or obsolete_ids or retagged:
+        invalidate_answers(sources={filename}, assets=previous_tags | {asset_tag})
+    print(
+        f"[Paper Brain] Re-ingested {filename}: {len(changed)}/{len(fingerprints)} pages changed, "
+        f"{len(new_chunks)} chunks written, {len(obsolete_ids)} removed"
+    )
+    return _result(
+        filename,
+        stored["chunks_stored"],
+        sum(len(entry["ids"]) for entry in stored_pages.values()) - len(obsolete_ids),
+        stored["assets_linked"],
+        chunks_deleted=len(obsolete_ids)
+    )
+
+
+def _result(filename: str, stored: int, skipped: int, linked: int, chunks_deleted: int = 0) -> dict:
+    return {
+        "chunks_stored": stored,
+        "chunks_skipped": skipped,
+        "chunks_deleted": chunks_deleted,
+        "assets_linked": linked,
+        "filename": filename
+    }
+
+
+def attach_page_hashes(chunks: list[dict], fingerprints: list[str]) -> list[dict]:
+    for chunk in chunks:
+        chunk["page_hash"] = fingerprints[chunk["page_number"] - 1]
+    return chunks
+
+
+# Assigns content-addressed ids and drops chunks already stored in BOTH
+# Qdrant and Neo4j (and, with an asset_tag, already linked to that asset).
+# Anything missing from either store is written again; both writes are
+# idempotent. Returns the chunks still to be written (each with an "id")
+# and how many were skipped.
+async def select_new_chunks(chunks: list[dict], asset_tag: str | None = None) -> tuple[list[dict], int]:
+    chunks_by_id = _assign_chunk_ids(chunks)
+    if not chunks_by_id:
+        return [], 0
+    ids = list(chunks_by_id)
+    in_qdrant, in_neo4j = await asyncio.gather(
+        _existing_chunk_ids(ids),
+        _linked_chunk_ids(ids, asset_tag)
+    )
+    existing_ids = in_qdrant & in_neo4j
+    new_chunks = [c for chunk_id, c in chunks_by_id.items() if chunk_id not in existing_ids]
+    return new_chunks, len(chunks) - len(new_chunks)
+
+
+async def store_chunks(
+    chunks: list[dict],
+    vectors: list[list[float]],
+    asset_tag: str | None = None,
+    progress: ProgressCallback | None = None
+) -> dict:
+    # Qdrant and Neo4j don't depend on each other, so both writes run at once.
+    # A failure in either fails the job. A retry is safe because
+    # select_new_chunks only skips chunks present in both stores, and
+    # upserts by content-addressed id and Neo4j MERGEs are idempotent.
+    chunks_stored, assets_linked = await asyncio.gather(
+        _upsert_chunks(chunks, vectors, asset_tag, progress),
+        _write_chunks_to_neo4j(chunks, asset_tag, progress)
+    )
+    return {"chunks_stored": chunks_stored, "assets_linked": assets_linked}
+
+
+async def _upsert_chunks(
+    chunks: list[dict],
+    vectors: list[list[float]],
+    asset_tag: str | None,
+    progress: ProgressCallback | None = None
+) -> int:
+    # Points are built per batch so only in-flight batches hold PointStructs.
+    # Every batch but the last uses wait=False (acknowledged once in Qdrant's
+    # WAL). The last goes out with wait=True once the others are acknowledged:
+    # the collection's single shard applies updates in WAL order, so its
+    # return means every earlier batch is applied too, overwrites of
+    # existing ids included, before the job reports success.
+    settings = get_settings()
+    client = await get_qdrant_client()
+    batch_size = max(1, settings.qdrant_upsert_batch_size)
+    semaphore = asyncio.Semaphore(max(1, settings.qdrant_upsert_parallelism))
+    done = 0
+
+    async def upsert_batch(start: int, wait: bool = False) -> None:
+        nonlocal done
+        async with semaphore:
+            points = [
+                PointStruct(
+                    id=chunk["id"],
+                    vector={DENSE_VECTOR: vector, SPARSE_VECTOR: encode_document(chunk["chunk_text"])},
+                    payload={
+                        "chunk_text": chunk["chunk_text"],
+                        "source_file": chunk["source_file"],
+                        "page_number": chunk["page_number"],
+                        "asset_tag": asset_tag,
+                        "chunk_index": chunk["chunk_index"],
+                        "page_hash": chunk.get("page_hash")
+                    }
+                )
+                for chunk, vector in zip(chunks[start:start + batch_size], vectors[start:start + batch_size])
+            ]
+            await _with_retries(
+                lambda: client.upsert(
+                    collection_name=settings.qdrant_collection_name,
+                    points=points,
+                    wait=wait
+                ),
+                settings.qdrant_upsert_retries
+            )
+        done += len(points)
+        _report(progress, "qdrant", done, len(chunks))
+
+    starts = list(range(0, len(chunks), batch_size))
+    await asyncio.gather(*(upsert_batch(start) for start in starts[:-1]))
+    if starts:
+        await upsert_batch(starts[-1], wait=True)
+    return len(chunks)
+
+
+async def _with_retries(operation: Callable[[], Awaitable], attempts: int):
+    # Exponential backoff: 0.5s, 1s, 2s, ... between attempts.
+    attempts = max(1, attempts)
+    for attempt in range(attempts):
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt == attempts - 1:
+                raise
+            delay = 0.5 * 2 ** attempt
+            print(f"[Paper Brain] Qdrant upsert failed ({e}); retrying in {delay:g}s")
+            await asyncio.sleep(delay)
+
+
+def _report(progress: ProgressCallback | None, stage: str, done: int, total: int) -> None:
+    if progress:
+        progress(stage, done, total)
+
+
+async def _embed_chunks(texts: list[str], progress: ProgressCallback | None) -> list[list[float]]:
+    # Slices go through the shared micro-batcher concurrently; slicing only
+    # gives progress reporting a unit of work to count.
+    step = max(1, get_settings().embedding_max_batch_size)
+    done = 0
+
+    async def embed_slice(piece: list[str]) -> list[list[float]]:
+        nonlocal done
+        vectors = await embed_texts(piece)
+        done += len(piece)
+        _report(progress, "embed", done, len(texts))
+        return vectors
+
+    results = await asyncio.gather(*(
+        embed_slice(texts[start:start + step]) for start in range(0, len(texts), step)
+    ))
+    return [vector for piece in results for vector in piece]
+
+
+def _chunk_id(source_file: str, page_number: int, chunk_text: str) -> str:
+    text_hash = hashlib.sha256(chunk_text.encode("utf-8")).hexdigest()
+    return str(uuid.uuid5(_CHUNK_NAMESPACE, f"{source_file}|{page_number}|{text_hash}"))
+
 
-    chunk_texts = [c["chunk_text"] for c in chunks]
-    vectors = await embed_texts(chunk_texts)
+def _assign_chunk_ids(chunks: list[dict]) -> dict[str, dict]:
+    # Identical text on the same page collapses to one id, so keep the first.
+    # chunk_index is the position within the page, so re-reading one page
+    # doesn't renumber the rest of the document.
+    chunks_by_id = {}
+    positions: dict[int, int] = {}
+    for chunk in chunks:
+        index = positions.get(chunk["page_number"], 0)
+        positions[chunk["page_number"]] = index + 1
+        chunk_id = _chunk_id(chunk["source_file"], chunk["page_number"], chunk["chunk_text"])
+        if chunk_id not in chunks_by_id:
+            chunks_by_id[chunk_id] = {**chunk, "id": chunk_id, "chunk_index": index}
+    return chunks_by_id
 
+
+async def _existing_chunk_ids(chunk_ids: list[str]) -> set[str]:
     settings = get_settings()
     client = await get_qdrant_client()
+    records = await client.retrieve(
+        collection_name=settings.qdrant_collection_name,
+        ids=chunk_ids,
+        with_payload=False,
+        with_vectors=False
+    )
+    return {str(r.id) for r in records}
+
+
+async def _linked_chunk_ids(chunk_ids: list[str], asset_tag: str | None) -> set[str]:
+    # DocumentChunk nodes that exist and, if the tagged asset exists, are
+    # DOCUMENTED_BY it, so re-ingesting under a new tag still links it.
+    driver = await get_driver()
+    async with driver.session() as session:
+        result = await session.run(
+            """
+            OPTIONAL MATCH (a:Asset {tag_number: $tag})
+            WITH a
+            UNWIND $ids AS id
+            MATCH (dc:DocumentChunk {id: id})
+            WHERE a IS NULL OR (a)-[:DOCUMENTED_BY]->(dc)
+            RETURN dc.id AS id
+            """,
+            ids=chunk_ids,
+            tag=asset_tag
+        )
+        return {record["id"] async for record in result}
 
-    points = []
-    chunk_ids = []
-    for i, (chunk, vector) in enumerate(zip(chunks, vectors)):
-        chunk_id = str(uuid.uuid4())
-        chunk_ids.append(chunk_id)
-        points.append(PointStruct(
-            id=chunk_id,
-            vector=vector,
-            payload={
-                "chunk_text": chunk["chunk_text"],
-                "source_file": chunk["source_file"],
-                "page_number": chunk["page_number"],
-                "asset_tag": asset_tag,
-                "chunk_index": i
-            }
-        ))
-
-    await client.upsert(
+
+async def _stored_pages(source_file: str) -> dict[int, dict]:
+    # page_number -> {"hashes": page_hash values seen, "ids": point ids,
+    # "tags": asset_tag values seen}. Points written before page hashing
+    # carry None, so their pages count as changed once and are re-hashed.
+    settings = get_settings()
+    client = await get_qdrant_client()
+    source_filter = Filter(must=[FieldCondition(key="source_file", match=MatchValue(value=source_file))])
+    pages: dict[int, dict] = {}
+    offset = None
+    while True:
+        records, offset = await client.scroll(
+            collection_name=settings.qdrant_collection_name,
+            scroll_filter=source_filter,
+            limit=1000,
+            offset=offset,
+            with_payload=["page_number", "page_hash", "asset_tag"],
+            with_vectors=False
+        )
+        for record in records:
+            entry = pages.setdefault(record.payload["page_number"], {"hashes": set(), "ids": set(), "tags": set()})
+            entry["hashes"].add(record.payload.get("page_hash"))
+            entry["tags"].add(record.payload.get("asset_tag"))
+            entry["ids"].add(str(record.id))
+        if offset is None:
+            return pages
+
+
+async def _refresh_chunk_positions(chunks: list[dict]) -> None:
+    # Unchanged chunks on a changed page keep their vectors; only the page
+    # hash and in-page position are rewritten, in one request.
+    settings = get_settings()
+    client = await get_qdrant_client()
+    await client.batch_update_points(
+        collection_name=settings.qdrant_collection_name,
+        update_operations=[
+            SetPayloadOperation(set_payload=SetPayload(
+                payload={"page_hash": chunk["page_hash"], "chunk_index": chunk["chunk_index"]},
+                points=[chunk["id"]]
+            ))
+            for chunk in chunks
+        ]
+    )
+
+
+async def _retag_points(point_ids: list[str], asset_tag: str | None) -> None:
+    # Only the payload changes; tag-filtered search reads asset_tag.
+    settings = get_settings()
+    client = await get_qdrant_client()
+    await client.set_payload(
         collection_name=settings.qdrant_collection_name,
-        points=points
+        payload={"asset_tag": asset_tag},
+        points=point_ids,
+        wait=True
     )
 
+
+async def _relink_chunks_in_neo4j(chunk_ids: list[str], asset_tag: str | None) -> None:
+    batch_size = max(1, get_settings().neo4j_write_batch_size)
+    driver = await get_driver()
+    async with driver.session() as session:
+        for start in range(0, len(chunk_ids), batch_size):
+            await session.execute_write(_relink_chunk_batch, chunk_ids[start:start + batch_size], asset_tag)
+
+
+async def _relink_chunk_batch(tx, chunk_ids: list[str], asset_tag: str | None) -> None:
+    # Drops DOCUMENTED_BY edges from any other asset, then links the new
+    # one if it exists (with no tag, the chunks are left unlinked).
+    await tx.run(
+        """
+        UNWIND $ids AS id
+        MATCH (dc:DocumentChunk {id: id})
+        OPTIONAL MATCH (old:Asset)-[r:DOCUMENTED_BY]->(dc)
+        WHERE $tag IS NULL OR old.tag_number <> $tag
+        DELETE r
+        WITH DISTINCT dc
+        MATCH (a:Asset {tag_number: $tag})
+        MERGE (a)-[:DOCUMENTED_BY]->(dc)
+        """,
+        ids=chunk_ids,
+        tag=asset_tag
+    )
+
+
+async def _delete_points(source_file: str, point_ids: list[str]) -> None:
+    # The source_file condition keeps a stale id list from ever touching
+    # another document's points.
+    settings = get_settings()
+    client = await get_qdrant_client()
+    await client.delete(
+        collection_name=settings.qdrant_collection_name,
+        points_selector=FilterSelector(filter=Filter(must=[
+            FieldCondition(key="source_file", match=MatchValue(value=source_file)),
+            HasIdCondition(has_id=point_ids)
+        ]))
+    )
+
+
+async def _delete_chunks_from_neo4j(chunk_ids: list[str]) -> None:
+    batch_size = max(1, get_settings().neo4j_write_batch_size)
+    driver = await get_driver()
+    async with driver.session() as session:
+        for start in range(0, len(chunk_ids), batch_size):
+            await session.execute_write(_delete_chunk_batch, chunk_ids[start:start + batch_size])
+
+
+async def _delete_chunk_batch(tx, chunk_ids: list[str]) -> None:
+    # DETACH removes the DOCUMENTED_BY edges along with the nodes.
+    await tx.run(
+        """
+        UNWIND $ids AS id
+        MATCH (dc:DocumentChunk {id: id})
+        DETACH DELETE dc
+        """,
+        ids=chunk_ids
+    )
+
+
+async def _write_chunks_to_neo4j(
+    chunks: list[dict],
+    asset_tag: str | None,
+    progress: ProgressCallback | None = None
+) -> int:
+    settings = get_settings()
+    batch_size = max(1, settings.neo4j_write_batch_size)
+    rows = [
+        {
+            "id": chunk["id"],
+            "source_file": chunk["source_file"],
+            "page_number": chunk["page_number"],
+            "chunk_text": chunk["chunk_text"][:500]
+        }
+        for chunk in chunks
+    ]
+
     assets_linked = 0
     driver = await get_driver()
     async with driver.session() as session:
-        for chunk, chunk_id in zip(chunks, chunk_ids):
-            await session.run(
-                """
-                CREATE (dc:DocumentChunk {
-                    id: $id,
-                    source_file: $source_file,
-                    page_number: $page_number,
-                    chunk_text: $chunk_text
-                })
-                """,
-                id=chunk_id,
-                source_file=chunk["source_file"],
-                page_number=chunk["page_number"],
-                chunk_text=chunk["chunk_text"][:500]
+        for start in range(0, len(rows), batch_size):
+            assets_linked += await session.execute_write(
+                _write_chunk_batch, rows[start:start + batch_size], asset_tag
             )
-            if asset_tag:
-                result = await session.run(
-                    """
-                    MATCH (a:Asset {tag_number: $tag})
-                    MATCH (dc:DocumentChunk {id: $chunk_id})
-                    MERGE (a)-[:DOCUMENTED_BY]->(dc)
-                    RETURN a.tag_number
-                    """,
-                    tag=asset_tag,
-                    chunk_id=chunk_id
-                )
-                record = await result.single()
-                if record:
-                    assets_linked += 1
+            _report(progress, "neo4j", min(start + batch_size, len(rows)), len(rows))
+    return assets_linked
 
-    return {
-        "chunks_stored": len(points),
-        "assets_linked": assets_linked,
-        "filename": filename
-    }
+
+async def _write_chunk_batch(tx, rows: list[dict], asset_tag: str | None) -> int:
+    # The asset lookup runs once per batch; with no tag it matches nothing.
+    result = await tx.run(
+        """
+        OPTIONAL MATCH (a:Asset {tag_number: $tag})
+        WITH a
+        UNWIND $rows AS row
+        MERGE (dc:DocumentChunk {id: row.id})
+        ON CREATE SET
+            dc.source_file = row.source_file,
+            dc.page_number = row.page_number,
+            dc.chunk_text = row.chunk_text
+        WITH a, dc
+        WHERE a IS NOT NULL
+        MERGE (a)-[:DOCUMENTED_BY]->(dc)
+        RETURN count(dc) AS linked
+        """,
+        rows=rows,
+        tag=asset_tag
+    )
+    record = await result.single()
+    return record["linked"] if record else 0
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import uuid
+from pipelines.ingestion_pipeline import ingest_document, reingest_document
+from services.upload_service import mapped_file
+from database.job_store import JobStore, get_job_store, ACTIVE_STATUSES
+from config import get_settings
+
+_queue: asyncio.Queue | None = None
+_workers: list[asyncio.Task] = []
+_running: dict[str, asyncio.Task] = {}
+
+
+async def start_job_workers() -> None:
+    global _queue
+    settings = get_settings()
+    store = await get_job_store()
+    os.makedirs(settings.ingest_job_dir, exist_ok=True)
+    _queue = asyncio.Queue()
+
+    # Jobs interrupted by a restart are re-run from the spooled upload; chunk
+    # ids are content-addressed, so anything already written is skipped.
+    for job in reversed(store.list(ACTIVE_STATUSES, limit=10_000)):
+        if os.path.exists(job["file_path"]):
+            store.set_status(job["id"], "queued")
+            _queue.put_nowait(job["id"])
+        else:
+            store.set_status(job["id"], "failed", error="Upload was lost before the job could resume")
+
+    for _ in range(max(1, settings.ingest_workers)):
+        _workers.append(asyncio.create_task(_worker(store)))
+
+
+async def stop_job_workers() -> None:
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+def new_job_upload(filename: str) -> tuple[str, str]:
+    settings = get_settings()
+    job_id = str(uuid.uuid4())
+    extension = os.path.splitext(filename)[1].lower()
+    return job_id, os.path.join(settings.ingest_job_dir, f"{job_id}{extension}")
+
+
+async def submit_document_job(
+    job_id: str,
+    file_path: str,
+    filename: str,
+    asset_tag: str | None = None,
+    reingest: bool = False
+) -> dict:
+    store = await get_job_store()
+    job = store.create(job_id, "document", filename, file_path, asset_tag, options={"reingest": reingest})
+    _queue.put_nowait(job_id)
+    return job
+
+
+async def cancel_job(job_id: str) -> dict | None:
+    store = await get_job_store()
+    job = store.get(job_id)
+    if job is None or job["status"] not in ACTIVE_STATUSES:
+        return job
+
+    task = _running.get(job_id)
+    if task:
+        task.cancel()
+        await asyncio.wait({task})
+    else:
+        # Still queued: the worker skips anything no longer in "queued".
+        store.set_status(job_id, "cancelled")
+        _discard_upload(job)
+    return store.get(job_id)
+
+
+async def _worker(store: JobStore) -> None:
+    while True:
+        job_id = await _queue.get()
+        try:
+            job = store.get(job_id)
+            if job is None or job["status"] != "queued":
+                continue
+            store.set_status(job_id, "running")
+            task = asyncio.create_task(_run_job(store, job))
+            _running[job_id] = task
+            try:
+                await asyncio.wait({task})
+            except asyncio.CancelledError:
+                # Shutdown: leave the upload on disk so the next start resumes it.
+                task.cancel()
+                await asyncio.wait({task})
+                store.set_status(job_id, "queued")
+                raise
+            if task.cancelled():
+                store.set_status(job_id, "cancelled")
+                _discard_upload(job)
+        finally:
+            _running.pop(job_id, None)
+            _queue.task_done()
+
+
+async def _run_job(store: JobStore, job: dict) -> None:
+    job_id = job["id"]
+
+    def on_progress(stage: str, done: int, total: int) -> None:
+        store.set_progress(job_id, stage, done, total)
+
+    ingest = reingest_document if job["options"].get("reingest") else ingest_document
+    try:
+        with mapped_file(job["file_path"]) as pdf_bytes:
+            result = await ingest(pdf_bytes, job["filename"], job["asset_tag"], progress=on_progress)
+    except Exception as exc:
+        store.set_status(job_id, "failed", error=str(exc))
+        _discard_upload(job)
+        return
+
+    store.set_status(job_id, "succeeded", result=result)
+    _discard_upload(job)
+
+
+def _discard_upload(job: dict) -> None:
+    try:
+        os.remove(job["file_path"])
+    except FileNotFoundError:
+        pass
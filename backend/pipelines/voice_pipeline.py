@@ -1,64 +1,249 @@
+import asyncio
+import mmap
 import uuid
 from datetime import datetime, timezone
-from services.speech_service import transcribe_audio
-from services.gemini_service import extract_knowledge_observation
+from google.cloud import speech_v1 as speech
+from services.speech_service import transcribe_audio_stream
+from services.gemini_service import extract_knowledge_observation, extract_issue_and_mitigation
+from services.asset_matcher import AssetMatcher
+from services.answer_cache import invalidate_answers
 from database.neo4j_client import get_driver
+from config import get_settings
 
 
-async def ingest_voice_note(audio_bytes: bytes, author: str = "field_operator") -> dict:
-    transcript = await transcribe_audio(audio_bytes)
+_asset_matcher: AssetMatcher | None = None
+_extractions = {"total": 0, "fast_path": 0}
+_stt_semaphore: asyncio.Semaphore | None = None
+_ner_semaphore: asyncio.Semaphore | None = None
+
+
+async def refresh_asset_matcher() -> int:
+    # Rebuilds the tag dictionary from Neo4j; called at startup and after seeding.
+    global _asset_matcher
+    driver = await get_driver()
+    async with driver.session() as session:
+        result = await session.run(
+            "MATCH (a:Asset) WHERE a.tag_number IS NOT NULL RETURN a.tag_number AS tag, a.id AS id"
+        )
+        assets = [(record["tag"], record["id"]) async for record in result]
+    _asset_matcher = AssetMatcher(assets)
+    print(f"[Paper Brain] Asset dictionary loaded: {len(assets)} assets, {_asset_matcher.patterns} spoken variants")
+    return len(assets)
+
+
+def match_asset_tags(text: str) -> set[str]:
+    return _asset_matcher.match(text) if _asset_matcher else set()
+
+
+def asset_matcher_stats() -> dict:
+    total = _extractions["total"]
+    return {
+        "assets": _asset_matcher.assets if _asset_matcher else 0,
+        "patterns": _asset_matcher.patterns if _asset_matcher else 0,
+        "extractions": total,
+        "fast_path_hits": _extractions["fast_path"],
+        "hit_rate": round(_extractions["fast_path"] / total, 4) if total else 0.0
+    }
+
+
+def _get_stt_semaphore() -> asyncio.Semaphore:
+    # Process-wide, like the OCR semaphore: concurrent requests share quota.
+    global _stt_semaphore
+    if _stt_semaphore is None:
+        _stt_semaphore = asyncio.Semaphore(max(1, get_settings().voice_stt_max_concurrency))
+    return _stt_semaphore
+
+
+def _get_ner_semaphore() -> asyncio.Semaphore:
+    global _ner_semaphore
+    if _ner_semaphore is None:
+        _ner_semaphore = asyncio.Semaphore(max(1, get_settings().voice_ner_max_concurrency))
+    return _ner_semaphore
+
+
+async def ingest_voice_note(
+    audio_bytes: bytes | mmap.mmap,
+    author: str = "field_operator",
+    speech_client: speech.SpeechClient | None = None
+) -> dict:
+    transcript, extracted = await transcribe_and_extract(audio_bytes, speech_client)
     if not transcript:
         return {"error": "No speech detected in audio", "transcript": ""}
 
-    extracted = await extract_knowledge_observation(transcript)
+    row = _observation_row(transcript, extracted, author)
+    linked = await _write_observations([row])
+    return {
+        "transcript": transcript,
+        "observation_id": row["id"],
+        "asset_linked": linked.get(row["id"]),
+        "extracted": extracted
+    }
 
-    obs_id = str(uuid.uuid4())
-    timestamp = datetime.now(timezone.utc).isoformat()
 
-    driver = await get_driver()
-    asset_linked = None
+# Transcribes and extracts every clip concurrently (bounded by the STT and
+# NER semaphores), then stores all observations in one transaction. Returns
+# one result per clip, in input order; failed clips carry an "error".
+async def ingest_voice_notes(
+    clips: list[tuple[str, bytes | mmap.mmap]],
+    author: str = "field_operator",
+    speech_client: speech.SpeechClient | None = None
+) -> list[dict]:
+    async def process(filename: str, audio_bytes: bytes | mmap.mmap) -> dict:
+        try:
+            transcript, extracted = await transcribe_and_extract(audio_bytes, speech_client)
+            if not transcript:
+                return {"filename": filename, "error": "No speech detected in audio", "transcript": ""}
+            row = _observation_row(transcript, extracted, author)
+        except Exception as exc:
+            return {"filename": filename, "error": f"Processing failed: {exc}", "transcript": ""}
+        return {"filename": filename, "transcript": transcript, "extracted": extracted, "row": row}
 
+    results = await asyncio.gather(*(process(name, audio) for name, audio in clips))
+    rows = [r.pop("row") for r in results if "row" in r]
+    if not rows:
+        return results
+
+    try:
+        linked = await _write_observations(rows)
+    except Exception as exc:
+        for result in results:
+            if "error" not in result:
+                result["error"] = f"Failed to store observation: {exc}"
+        return results
+
+    for result, row in zip((r for r in results if "error" not in r), rows):
+        result["observation_id"] = row["id"]
+        result["asset_linked"] = linked.get(row["id"])
+    return results
+
+
+def _observation_row(transcript: str, extracted: dict, author: str) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "author": author,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "transcript": transcript,
+        "observed_issue": extracted.get("observed_issue", ""),
+        "mitigation_action": extracted.get("mitigation_action") or "",
+        "confidence_score": float(extracted.get("confidence_index", 0.5)),
+        "tag": extracted.get("target_asset_tag")
+    }
+
+
+async def _write_observations(rows: list[dict]) -> dict[str, str]:
+    # Returns observation id -> linked asset tag for observations whose tag
+    # matched an Asset.
+    driver = await get_driver()
     async with driver.session() as session:
-        await session.run(
-            """
-            CREATE (o:KnowledgeObservation {
-                id: $id,
-                author: $author,
-                timestamp: $timestamp,
-                transcript: $transcript,
-                observed_issue: $observed_issue,
-                mitigation_action: $mitigation_action,
-                confidence_score: $confidence_score
-            })
-            """,
-            id=obs_id,
-            author=author,
-            timestamp=timestamp,
-            transcript=transcript,
-            observed_issue=extracted.get("observed_issue", ""),
-            mitigation_action=extracted.get("mitigation_action") or "",
-            confidence_score=float(extracted.get("confidence_index", 0.5))
+        linked = await session.execute_write(_write_observation_batch, rows)
+    invalidate_answers(assets=set(linked.values()))
+    return linked
+
+
+async def _write_observation_batch(tx, rows: list[dict]) -> dict[str, str]:
+    result = await tx.run(
+        """
+        UNWIND $rows AS row
+        CREATE (o:KnowledgeObservation {
+            id: row.id,
+            author: row.author,
+            timestamp: row.timestamp,
+            transcript: row.transcript,
+            observed_issue: row.observed_issue,
+            mitigation_action: row.mitigation_action,
+            confidence_score: row.confidence_score
+        })
+        WITH o, row
+        OPTIONAL MATCH (a:Asset {tag_number: row.tag})
+        FOREACH (_ IN CASE WHEN a IS NULL THEN [] ELSE [1] END |
+            MERGE (a)-[:HAS_OBSERVATION]->(o)
         )
+        RETURN o.id AS id, a.tag_number AS tag
+        """,
+        rows=rows
+    )
+    return {record["id"]: record["tag"] async for record in result if record["tag"]}
+
+
+async def transcribe_and_extract(
+    audio_bytes: bytes | mmap.mmap,
+    speech_client: speech.SpeechClient | None = None
+) -> tuple[str, dict]:
+    # Final segments are grouped into windows of voice_ner_window_chars; each
+    # full window is extracted while the rest of the clip is still being
+    # recognized, and the remainder once the stream ends. Most notes fit in
+    # one window, so they cost one LLM call on the whole transcript; long
+    # ones cost one call per window instead of one per utterance.
+    window_chars = max(1, get_settings().voice_ner_window_chars)
+    segments: list[str] = []
+    window: list[str] = []
+    extractions: list[asyncio.Task] = []
+    try:
+        async with _get_stt_semaphore():
+            async for segment in transcribe_audio_stream(audio_bytes, speech_client):
+                text = segment.text.strip()
+                if segment.is_final and text:
+                    segments.append(text)
+                    window.append(text)
+                    if sum(len(t) + 1 for t in window) > window_chars:
+                        extractions.append(asyncio.create_task(_extract(" ".join(window))))
+                        window = []
+        if window:
+            extractions.append(asyncio.create_task(_extract(" ".join(window))))
+        if not segments:
+            return "", {}
+        transcript = " ".join(segments)
+        extracted = _merge_extractions(await asyncio.gather(*extractions))
+        # The dictionary sees the whole transcript, so a tag named in one
+        # segment overrides whatever the LLM guessed for the others.
+        tags = match_asset_tags(transcript)
+        if len(tags) == 1:
+            extracted["target_asset_tag"] = next(iter(tags))
+        return transcript, extracted
+    except BaseException:
+        for task in extractions:
+            task.cancel()
+        raise
+
+
+async def _extract(text: str) -> dict:
+    # Fast path: exactly one known tag in the text means the LLM only has to
+    # pull out the issue and mitigation.
+    tags = match_asset_tags(text)
+    _extractions["total"] += 1
+    async with _get_ner_semaphore():
+        if len(tags) == 1:
+            _extractions["fast_path"] += 1
+            return await extract_issue_and_mitigation(text, next(iter(tags)))
+        return await extract_knowledge_observation(text)
+
 
-        target_tag = extracted.get("target_asset_tag")
-        if target_tag:
-            result = await session.run(
-                """
-                MATCH (a:Asset {tag_number: $tag})
-                MATCH (o:KnowledgeObservation {id: $obs_id})
-                MERGE (a)-[:HAS_OBSERVATION]->(o)
-                RETURN a.tag_number
-                """,
-                tag=target_tag,
-                obs_id=obs_id
-            )
-            record = await result.single()
-            if record:
-                asset_linked = record["a.tag_number"]
+def _merge_extractions(extractions: list[dict]) -> dict:
+    # One observation per voice note: the tag comes from the most confident
+    # window that named one; issues and actions are concatenated in order.
+    if len(extractions) == 1:
+        return extractions[0]
 
+    def confidence(extracted: dict) -> float:
+        try:
+            return float(extracted.get("confidence_index", 0.5))
+        except (TypeError, ValueError):
+            return 0.5
+
+    tagged = [e for e in extractions if e.get("target_asset_tag")]
+    issues = _distinct(e.get("observed_issue") for e in extractions)
+    actions = _distinct(e.get("mitigation_action") for e in extractions)
     return {
-        "transcript": transcript,
-        "observation_id": obs_id,
-        "asset_linked": asset_linked,
-        "extracted": extracted
+        "target_asset_tag": max(tagged, key=confidence)["target_asset_tag"] if tagged else None,
+        "observed_issue": "; ".join(issues),
+        "mitigation_action": "; ".join(actions) or None,
+        "confidence_index": round(sum(confidence(e) for e in extractions) / len(extractions), 2)
     }
+
+
+def _distinct(values) -> list[str]:
+    seen = []
+    for value in values:
+        if value and value not in seen:
+            seen.append(value)
+    return seen
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException
+import time
+from fastapi import APIRouter, HTTPException, Query
 from database.neo4j_client import get_driver
-from models.schemas import AssetGraphResponse, AssetNode, AssetNeighbor
+from database.topology_cache import DOWNSTREAM, UPSTREAM, get_topology
+from models.schemas import AssetGraphResponse, AssetNode, AssetNeighbor, AssetImpactResponse, ImpactedAsset
 
 router = APIRouter(prefix="/graph", tags=["graph"])
 
@@ -46,3 +48,26 @@ async def get_asset_graph(tag_number: str):
         observations=[o for o in record["observations"] if o],
         document_sources=list(set(s for s in record["doc_sources"] if s))
     )
+
+
+@router.get("/impact/{tag_number}", response_model=AssetImpactResponse)
+async def get_asset_impact(tag_number: str, depth: int | None = Query(None, ge=1)):
+    # Failure-impact set from the in-process topology mirror; no Neo4j round trip.
+    topology = get_topology()
+    if topology is None:
+        raise HTTPException(status_code=503, detail="Topology mirror is not loaded")
+    if tag_number not in topology:
+        raise HTTPException(status_code=404, detail=f"Asset '{tag_number}' not found")
+
+    started = time.perf_counter()
+    downstream = topology.reachable(tag_number, DOWNSTREAM, depth)
+    upstream = topology.reachable(tag_number, UPSTREAM, depth)
+    elapsed_us = (time.perf_counter() - started) * 1_000_000
+
+    return AssetImpactResponse(
+        tag_number=tag_number,
+        downstream=[ImpactedAsset(tag_number=t, hops=h) for t, h in downstream.items()],
+        upstream=[ImpactedAsset(tag_number=t, hops=h) for t, h in upstream.items()],
+        topology_version=topology.version,
+        elapsed_us=round(elapsed_us, 1)
+    )
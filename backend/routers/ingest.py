@@ -1,43 +1,80 @@
+from contextlib import ExitStack
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from pipelines.ingestion_pipeline import ingest_document
-from pipelines.voice_pipeline import ingest_voice_note
-from models.schemas import IngestDocumentResponse, IngestVoiceResponse
+from pipelines.job_queue import new_job_upload, submit_document_job, cancel_job
+from pipelines.voice_pipeline import ingest_voice_note, ingest_voice_notes
+from services.upload_service import UploadTooLarge, spool_upload, mapped_upload
+from database.job_store import get_job_store
+from config import get_settings
+from models.schemas import (
+    IngestDocumentResponse, IngestJobResponse, IngestJobStatus, IngestVoiceResponse,
+    IngestVoiceBatchResponse, VoiceBatchItem
+)
 
 router = APIRouter(prefix="/ingest", tags=["ingest"])
 
 
-@router.post("/document", response_model=IngestDocumentResponse)
+@router.post("/document", response_model=IngestJobResponse, status_code=202)
 async def upload_document(
     file: UploadFile = File(...),
-    asset_tag: str | None = Form(default=None)
+    asset_tag: str | None = Form(default=None),
+    reingest: bool = Form(default=False)
 ):
+    # reingest=true replaces a previously ingested file of the same name,
+    # rewriting only the pages that changed.
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are accepted")
 
-    pdf_bytes = await file.read()
-    if len(pdf_bytes) > 20 * 1024 * 1024:
-        raise HTTPException(status_code=413, detail="File too large. Max 20MB.")
+    max_bytes = get_settings().max_document_upload_bytes
+    job_id, file_path = new_job_upload(file.filename)
+    try:
+        await spool_upload(file, file_path, max_bytes)
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail=f"File too large. Max {max_bytes / (1024 * 1024):g}MB.")
 
-    result = await ingest_document(pdf_bytes, file.filename, asset_tag)
+    job = await submit_document_job(job_id, file_path, file.filename, asset_tag, reingest)
 
-    return IngestDocumentResponse(
-        filename=result["filename"],
-        chunks_stored=result["chunks_stored"],
-        assets_linked=result["assets_linked"],
-        message=f"Successfully ingested {result['chunks_stored']} chunks from {file.filename}"
+    return IngestJobResponse(
+        job_id=job["id"],
+        status=job["status"],
+        filename=job["filename"],
+        message=f"Queued {file.filename} for ingestion. Poll /ingest/jobs/{job['id']} for progress."
     )
 
 
+@router.get("/jobs", response_model=list[IngestJobStatus])
+async def list_jobs(limit: int = 50):
+    store = await get_job_store()
+    return [_job_status(job) for job in store.list(limit=limit)]
+
+
+@router.get("/jobs/{job_id}", response_model=IngestJobStatus)
+async def get_job(job_id: str):
+    store = await get_job_store()
+    job = store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return _job_status(job)
+
+
+@router.delete("/jobs/{job_id}", response_model=IngestJobStatus)
+async def delete_job(job_id: str):
+    job = await cancel_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return _job_status(job)
+
+
 @router.post("/voice", response_model=IngestVoiceResponse)
 async def upload_voice(
     file: UploadFile = File(...),
     author: str = Form(default="field_operator")
 ):
-    audio_bytes = await file.read()
-    if len(audio_bytes) > 10 * 1024 * 1024:
-        raise HTTPException(status_code=413, detail="Audio file too large. Max 10MB.")
-
-    result = await ingest_voice_note(audio_bytes, author)
+    max_bytes = get_settings().max_voice_upload_bytes
+    try:
+        with mapped_upload(file, max_bytes) as audio_bytes:
+            result = await ingest_voice_note(audio_bytes, author)
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail=f"Audio file too large. Max {max_bytes / (1024 * 1024):g}MB.")
 
     if "error" in result:
         raise HTTPException(status_code=422, detail=result["error"])
@@ -49,3 +86,76 @@ async def upload_voice(
         extracted=result["extracted"],
         message="Voice note processed and stored as KnowledgeObservation"
     )
+
+
+@router.post("/voice/batch", response_model=IngestVoiceBatchResponse)
+async def upload_voice_batch(
+    files: list[UploadFile] = File(...),
+    author: str = Form(default="field_operator")
+):
+    settings = get_settings()
+    if len(files) > settings.max_voice_batch_files:
+        raise HTTPException(status_code=400, detail=f"At most {settings.max_voice_batch_files} files per batch.")
+
+    max_bytes = settings.max_voice_upload_bytes
+    rejected: dict[int, str] = {}
+    with ExitStack() as stack:
+        clips = []
+        for index, file in enumerate(files):
+            try:
+                audio_bytes = stack.enter_context(mapped_upload(file, max_bytes))
+            except UploadTooLarge:
+                rejected[index] = f"Audio file too large. Max {max_bytes / (1024 * 1024):g}MB."
+                continue
+            clips.append((file.filename or f"file_{index}", audio_bytes))
+        processed = iter(await ingest_voice_notes(clips, author))
+
+    results = []
+    for index, file in enumerate(files):
+        if index in rejected:
+            result = {"filename": file.filename or f"file_{index}", "error": rejected[index]}
+        else:
+            result = next(processed)
+        results.append(VoiceBatchItem(
+            filename=result["filename"],
+            status="failed" if "error" in result else "stored",
+            observation_id=result.get("observation_id"),
+            transcript=result.get("transcript", ""),
+            asset_linked=result.get("asset_linked"),
+            extracted=result.get("extracted"),
+            error=result.get("error")
+        ))
+
+    stored = sum(1 for r in results if r.status == "stored")
+    return IngestVoiceBatchResponse(
+        results=results,
+        stored=stored,
+        failed=len(results) - stored,
+        message=f"Stored {stored} of {len(results)} voice notes as KnowledgeObservations"
+    )
+
+
+def _job_status(job: dict) -> IngestJobStatus:
+    result = job["result"]
+    return IngestJobStatus(
+        job_id=job["id"],
+        kind=job["kind"],
+        status=job["status"],
+        filename=job["filename"],
+        asset_tag=job["asset_tag"],
+        progress=job["progress"],
+        result=IngestDocumentResponse(
+            filename=result["filename"],
+            chunks_stored=result["chunks_stored"],
+            chunks_skipped=result["chunks_skipped"],
+            chunks_deleted=result.get("chunks_deleted", 0),
+            assets_linked=result["assets_linked"],
+            message=(
+                f"Successfully ingested {result['chunks_stored']} chunks from {result['filename']}"
+                f" ({result['chunks_skipped']} already stored, {result.get('chunks_deleted', 0)} removed)"
+            )
+        ) if result else None,
+        error=job["error"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"]
+    )
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from services.embedding_service import embedding_cache_stats, query_embedding_stats
+from pipelines.graphrag_pipeline import query_coalescing_stats
+from services.google_clients import executor_stats
+from pipelines.voice_pipeline import asset_matcher_stats
+from services.answer_cache import answer_cache_stats
+from database.topology_cache import topology_stats
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def get_metrics():
+    return {
+        "embedding_cache": embedding_cache_stats(),
+        "query_embeddings": query_embedding_stats(),
+        "query_coalescing": query_coalescing_stats(),
+        "executors": executor_stats(),
+        "asset_matcher": asset_matcher_stats(),
+        "answer_cache": answer_cache_stats(),
+        "topology": topology_stats()
+    }
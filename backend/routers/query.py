@@ -1,6 +1,8 @@
+import json
 import time
-from fastapi import APIRouter
-from pipelines.graphrag_pipeline import run_query
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from pipelines.graphrag_pipeline import run_query, stream_query
 from models.schemas import QueryRequest, QueryResponse
 
 router = APIRouter(prefix="/query", tags=["query"])
@@ -16,5 +18,43 @@ async def query_knowledge_base(request: QueryRequest):
         answer=result["answer"],
         route_taken=result["route_taken"],
         sources=result["sources"],
-        latency_ms=round(latency_ms, 2)
+        latency_ms=round(latency_ms, 2),
+        cached=result["cached"]
     )
+
+
+@router.post("/stream")
+async def stream_knowledge_base(request: QueryRequest, http_request: Request):
+    # Server-Sent Events: "route" and "sources" once retrieval is done, then
+    # one "token" event per Gemini chunk, then "done" with timings. ttfb_ms is
+    # time to the first event, first_token_ms to the first answer text.
+    start = time.time()
+
+    async def events():
+        ttfb_ms = first_token_ms = None
+        try:
+            async for event, data in stream_query(request.question):
+                elapsed_ms = round((time.time() - start) * 1000, 2)
+                if ttfb_ms is None:
+                    ttfb_ms = elapsed_ms
+                if event == "token" and first_token_ms is None:
+                    first_token_ms = elapsed_ms
+                if event == "done":
+                    data = {**data, "ttfb_ms": ttfb_ms, "first_token_ms": first_token_ms, "latency_ms": elapsed_ms}
+                yield _sse(event, data)
+                # Stop generating (and close the Gemini stream) once nobody is listening.
+                if await http_request.is_disconnected():
+                    print(f"[Paper Brain] Query stream cancelled by client after {elapsed_ms}ms")
+                    return
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
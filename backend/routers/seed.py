@@ -2,6 +2,9 @@ import os
 import pandas as pd
 from fastapi import APIRouter
 from database.neo4j_client import get_driver
+from database.topology_cache import apply_topology_changes, load_topology
+from pipelines.voice_pipeline import refresh_asset_matcher
+from services.answer_cache import invalidate_answers
 from models.schemas import SeedResponse, SeedRequest
 
 router = APIRouter(prefix="/seed", tags=["seed"])
@@ -19,6 +22,8 @@ async def load_seed_data(request: SeedRequest = SeedRequest()):
     driver = await get_driver()
     assets_created = 0
     relationships_created = 0
+    seeded_assets: dict[str, dict] = {}
+    seeded_edges: set[tuple[str, str]] = set()
 
     async with driver.session() as session:
         # Root facility
@@ -59,7 +64,7 @@ async def load_seed_data(request: SeedRequest = SeedRequest()):
                 WITH asset
                 MATCH (area:FunctionalArea {id: $area_id})
                 MERGE (area)-[:HAS_ASSET]->(asset)
-                RETURN asset.tag_number
+                RETURN asset.tag_number AS tag, properties(asset) AS props
                 """,
                 tag_number=row["tag_number"],
                 id=row["id"],
@@ -71,6 +76,7 @@ async def load_seed_data(request: SeedRequest = SeedRequest()):
             record = await result.single()
             if record:
                 assets_created += 1
+                seeded_assets[record["tag"]] = record["props"]
 
         # Topology relationships — topology CSV uses asset `id` column (e.g. PUMP-101)
         for _, row in topology_df.iterrows():
@@ -79,7 +85,7 @@ async def load_seed_data(request: SeedRequest = SeedRequest()):
                 MATCH (source:Asset {id: $source_id})
                 MATCH (target:Asset {id: $target_id})
                 MERGE (source)-[r:CONNECTED_TO {direction: $direction}]->(target)
-                RETURN source.tag_number, target.tag_number
+                RETURN source.tag_number AS source, target.tag_number AS target
                 """,
                 source_id=row["source_id"],
                 target_id=row["target_id"],
@@ -88,6 +94,12 @@ async def load_seed_data(request: SeedRequest = SeedRequest()):
             record = await result.single()
             if record:
                 relationships_created += 1
+                seeded_edges.add((record["source"], record["target"]))
+
+    await refresh_asset_matcher()
+    if apply_topology_changes(seeded_assets, seeded_edges) is None:
+        await load_topology()
+    invalidate_answers(assets=set(assets_df["tag_number"]))
 
     return SeedResponse(
         assets_created=assets_created,
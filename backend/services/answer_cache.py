@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+from config import get_settings
+
+# In-process semantic cache for /query answers. A lookup hits when a cached
+# question's embedding is close enough (cosine) AND it took the same route
+# and mentioned the same asset tags, so "what if P-101 trips" never answers
+# "what if P-102 trips". Entries remember which source files and asset tags
+# their context came from; ingestion touching either drops them.
+
+ANY_ASSET = "*"  # entry depends on the whole topology, not specific assets
+
+
+@dataclass
+class _Entry:
+    vector: np.ndarray
+    route: str
+    tags: frozenset[str]
+    result: dict
+    sources: frozenset[str]
+    assets: frozenset[str]
+    expires_at: float
+
+
+class SemanticAnswerCache:
+
+    def __init__(self, max_entries: int, ttl_s: float, min_similarity: float):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.min_similarity = min_similarity
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._matrix: np.ndarray | None = None  # rows follow _keys
+        self._keys: list[int] = []
+        self._next_key = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._expirations = 0
+        self._evictions = 0
+
+    def lookup(self, vector: list[float], route: str, tags: set[str]) -> dict | None:
+        query = _unit(vector)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if self._entries:
+                scores = self._vectors() @ query
+                for index in np.argsort(scores)[::-1]:
+                    if scores[index] < self.min_similarity:
+                        break
+                    key = self._keys[index]
+                    entry = self._entries[key]
+                    if entry.route == route and entry.tags == frozenset(tags):
+                        self._entries.move_to_end(key)
+                        self._hits += 1
+                        return entry.result
+            self._misses += 1
+            return None
+
+    def put(
+        self,
+        vector: list[float],
+        route: str,
+        tags: set[str],
+        result: dict,
+        sources: set[str],
+        assets: set[str]
+    ) -> None:
+        with self._lock:
+            self._entries[self._next_key] = _Entry(
+                vector=_unit(vector),
+                route=route,
+                tags=frozenset(tags),
+                result=result,
+                sources=frozenset(sources),
+                assets=frozenset(assets),
+                expires_at=time.monotonic() + self.ttl_s
+            )
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            self._matrix = None
+
+    def invalidate(self, sources: set[str] = frozenset(), assets: set[str] = frozenset()) -> int:
+        # Any asset change also drops entries built from the whole topology.
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry.sources & sources or entry.assets & assets or (assets and ANY_ASSET in entry.assets)
+            ]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._invalidations += len(stale)
+                self._matrix = None
+            return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._invalidations,
+                "expirations": self._expirations,
+                "evictions": self._evictions
+            }
+
+    def _expire(self, now: float) -> None:
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._expirations += len(expired)
+            self._matrix = None
+
+    def _vectors(self) -> np.ndarray:
+        # Stacked lazily; rebuilt only after the entry set changes.
+        if self._matrix is None:
+            self._keys = list(self._entries)
+            self._matrix = np.stack([self._entries[key].vector for key in self._keys])
+        return self._matrix
+
+
+def _unit(vector: list[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
+
+
+_cache: SemanticAnswerCache | None = None
+
+
+def get_answer_cache() -> SemanticAnswerCache | None:
+    # None when disabled (answer_cache_max_entries = 0).
+    global _cache
+    settings = get_settings()
+    if _cache is None and settings.answer_cache_max_entries > 0:
+        _cache = SemanticAnswerCache(
+            settings.answer_cache_max_entries,
+            settings.answer_cache_ttl_s,
+            settings.answer_cache_min_similarity
+        )
+    return _cache
+
+
+def invalidate_answers(sources: set[str] = frozenset(), assets: set[str] = frozenset()) -> int:
+    cache = get_answer_cache()
+    return cache.invalidate(set(sources), {a for a in assets if a}) if cache else 0
+
+
+def answer_cache_stats() -> dict:
+    cache = get_answer_cache()
+    return cache.stats() if cache else {"enabled": False}
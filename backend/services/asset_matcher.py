@@ -0,0 +1,135 @@
+import re
+from collections import deque
+from typing import Iterator
+
+# Dictionary NER for asset tags. Every tag expands to the ways an operator
+# might say it ("P-101", "P 101", "pump one oh one", ...); all variants go
+# into one Aho-Corasick automaton, so a transcript is scanned once no matter
+# how many assets exist. Text and patterns are normalized to lowercase words
+# separated by single spaces and padded with spaces, so matches always fall
+# on word boundaries.
+
+_ONES = (
+    "zero one two three four five six seven eight nine ten eleven twelve thirteen "
+    "fourteen fifteen sixteen seventeen eighteen nineteen"
+).split()
+_TENS = "_ _ twenty thirty forty fifty sixty seventy eighty ninety".split()
+_CODE = re.compile(r"([a-z]+)\s?(\d+)")
+_LETTER_DIGIT = re.compile(r"(?<=[a-z])(?=\d)|(?<=\d)(?=[a-z])")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+class AhoCorasick:
+
+    def __init__(self, patterns: dict[str, set[str]]):
+        # Trie as parallel lists: goto transitions, failure links, outputs.
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[set[str]] = [set()]
+        for pattern, values in patterns.items():
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(set())
+                node = nxt
+            self._out[node] |= values
+        self._link()
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] |= self._out[self._fail[child]]
+
+    def search(self, text: str) -> Iterator[set[str]]:
+        node = 0
+        for ch in text:
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            if self._out[node]:
+                yield self._out[node]
+
+
+class AssetMatcher:
+
+    def __init__(self, assets: list[tuple[str, str | None]]):
+        # assets: (tag_number, id) pairs, e.g. ("P-101", "PUMP-101").
+        patterns: dict[str, set[str]] = {}
+        for tag, asset_id in assets:
+            for variant in spoken_variants(tag, asset_id):
+                patterns.setdefault(f" {variant} ", set()).add(tag)
+        self.assets = len(assets)
+        self.patterns = len(patterns)
+        self._automaton = AhoCorasick(patterns)
+
+    def match(self, text: str) -> set[str]:
+        tags: set[str] = set()
+        for found in self._automaton.search(f" {normalize(text)} "):
+            tags |= found
+        return tags
+
+
+def normalize(text: str) -> str:
+    text = _LETTER_DIGIT.sub(" ", text.lower())
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def spoken_variants(tag: str, asset_id: str | None = None) -> set[str]:
+    variants = {normalize(tag)}
+    prefixes, numbers = set(), set()
+    for code in (tag, asset_id):
+        if not code:
+            continue
+        variants.add(normalize(code))
+        parsed = _CODE.fullmatch(normalize(code))
+        if parsed:
+            prefixes.add(parsed.group(1))
+            numbers |= number_forms(parsed.group(2))
+    variants |= {f"{prefix} {number}" for prefix in prefixes for number in numbers}
+    variants.discard("")
+    return variants
+
+
+def number_forms(digits: str) -> set[str]:
+    # "101" -> 101, "one oh one", "one zero one", "one hundred one",
+    # "one hundred and one"; "04" -> 04, 4, "oh four", "zero four", "four".
+    value = int(digits)
+    forms = {digits, str(value)}
+    for zero in ("zero", "oh"):
+        forms.add(" ".join(zero if d == "0" else _ONES[int(d)] for d in digits))
+    if value < 10_000:
+        forms.add(_say(value))
+    if 100 <= value < 1000:
+        hundreds, rest = divmod(value, 100)
+        if rest:
+            forms.add(f"{_ONES[hundreds]} hundred and {_say(rest)}")
+            if rest >= 10:
+                forms.add(f"{_ONES[hundreds]} {_say(rest)}")  # "one twenty"
+    if 1000 <= value < 10_000 and value % 100 >= 10:
+        forms.add(f"{_say(value // 100)} {_say(value % 100)}")  # "twelve thirty four"
+    return forms
+
+
+def _say(value: int) -> str:
+    if value < 20:
+        return _ONES[value]
+    if value < 100:
+        tens, ones = divmod(value, 10)
+        return _TENS[tens] + (f" {_ONES[ones]}" if ones else "")
+    if value < 1000:
+        hundreds, rest = divmod(value, 100)
+        return f"{_ONES[hundreds]} hundred" + (f" {_say(rest)}" if rest else "")
+    thousands, rest = divmod(value, 1000)
+    return f"{_say(thousands)} thousand" + (f" {_say(rest)}" if rest else "")
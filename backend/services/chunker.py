@@ -0,0 +1,101 @@
+from bisect import bisect_right
+
+# Chunking works on (start, end) character offsets into one shared text
+# buffer (Document AI's document.text). Boundaries snap to layout breaks,
+# then sentence ends, then whitespace; text is only copied when a span is
+# materialized.
+
+_SENTENCE_ENDS = (". ", "? ", "! ", ".\n", "?\n", "!\n")
+
+
+def page_bounds(page) -> tuple[int, int] | None:
+    segments = list(page.layout.text_anchor.text_segments)
+    if not segments and page.tokens:
+        first = page.tokens[0].layout.text_anchor.text_segments
+        last = page.tokens[-1].layout.text_anchor.text_segments
+        segments = [*first, *last]
+    if not segments:
+        return None
+    start = min(int(seg.start_index) if seg.start_index else 0 for seg in segments)
+    end = max(int(seg.end_index) for seg in segments)
+    return (start, end) if end > start else None
+
+
+def layout_breaks(page) -> list[int]:
+    # Paragraph ends are the preferred cut points; fall back to line ends.
+    blocks = page.paragraphs or page.lines
+    breaks = []
+    for block in blocks:
+        for seg in block.layout.text_anchor.text_segments:
+            breaks.append(int(seg.end_index))
+    breaks.sort()
+    return breaks
+
+
+def chunk_spans(
+    text: str,
+    start: int,
+    end: int,
+    max_chars: int = 1500,
+    overlap_chars: int = 150,
+    breaks: list[int] | None = None
+) -> list[tuple[int, int]]:
+    breaks = breaks or []
+    spans = []
+    pos = _skip_space(text, start, end)
+    while pos < end:
+        limit = pos + max_chars
+        if limit >= end:
+            cut = end
+        else:
+            # Never cut in the first half of a window, so chunks stay useful.
+            cut = _best_break(text, pos + max_chars // 2, limit, breaks)
+
+        chunk_end = _trim_space(text, pos, cut)
+        if chunk_end > pos:
+            spans.append((pos, chunk_end))
+        if cut >= end:
+            break
+
+        next_pos = _word_start(text, max(cut - overlap_chars, pos + 1), cut)
+        pos = _skip_space(text, next_pos, end)
+    return spans
+
+
+def materialize(text: str, spans: list[tuple[int, int]]) -> list[str]:
+    return [text[start:end] for start, end in spans]
+
+
+def _best_break(text: str, floor: int, limit: int, breaks: list[int]) -> int:
+    index = bisect_right(breaks, limit) - 1
+    if index >= 0 and breaks[index] >= floor:
+        return breaks[index]
+
+    sentence = max(text.rfind(mark, floor, limit + 1) for mark in _SENTENCE_ENDS)
+    if sentence >= 0:
+        return sentence + 1
+
+    space = max(text.rfind(" ", floor, limit), text.rfind("\n", floor, limit))
+    if space >= 0:
+        return space
+    return limit
+
+
+def _word_start(text: str, pos: int, limit: int) -> int:
+    # Move forward to the start of the next word so overlaps never begin mid-word.
+    if pos == 0 or text[pos - 1].isspace():
+        return pos
+    candidates = [i for i in (text.find(" ", pos, limit), text.find("\n", pos, limit)) if i >= 0]
+    return min(candidates) + 1 if candidates else pos
+
+
+def _skip_space(text: str, pos: int, end: int) -> int:
+    while pos < end and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def _trim_space(text: str, start: int, end: int) -> int:
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return end
@@ -0,0 +1,108 @@
+import re
+from services.embedding_service import estimate_tokens
+
+# Shapes retrieved chunks into the answer prompt. Neighbouring chunks of one
+# page share an overlap window (see services/chunker.py), so consecutive
+# chunk_index values from the same source and page are stitched back into
+# one passage with the overlap removed. Passages that repeat one another
+# (the same manual ingested twice under different names) are dropped, and
+# what is left is cut to a token budget in rank order.
+
+_WORD = re.compile(r"\w+")
+_MAX_OVERLAP_CHARS = 400  # a little over chunk_spans' overlap_chars plus word snapping
+_MIN_OVERLAP_CHARS = 20   # shorter matches are coincidence, not a shared window
+_MIN_TRUNCATED_TOKENS = 48  # don't bother with a sliver of a passage
+
+
+def merge_adjacent_chunks(results: list[dict]) -> list[dict]:
+    # Keeps the ranking of the best-scoring member of each merged run.
+    runs: dict[tuple, list[dict]] = {}
+    for rank, r in enumerate(results):
+        runs.setdefault((r["source_file"], r["page_number"]), []).append({**r, "rank": rank})
+
+    passages = []
+    for chunks in runs.values():
+        indexed = sorted((c for c in chunks if c.get("chunk_index") is not None), key=lambda c: c["chunk_index"])
+        passages.extend({**c, "chunks": 1} for c in chunks if c.get("chunk_index") is None)
+        current = None
+        for chunk in indexed:
+            if current and chunk["chunk_index"] == current["chunk_index"] + 1:
+                current["chunk_text"] = join_overlapping(current["chunk_text"], chunk["chunk_text"])
+                current["chunk_index"] = chunk["chunk_index"]
+                current["score"] = max(current["score"], chunk["score"])
+                current["rank"] = min(current["rank"], chunk["rank"])
+                current["chunks"] += 1
+            elif current and chunk["chunk_index"] == current["chunk_index"]:
+                continue  # same chunk stored twice
+            else:
+                current = {**chunk, "chunks": 1}
+                passages.append(current)
+
+    passages.sort(key=lambda p: p["rank"])
+    return [{k: v for k, v in p.items() if k != "rank"} for p in passages]
+
+
+def join_overlapping(first: str, second: str) -> str:
+    # Longest suffix of first that is also a prefix of second.
+    for size in range(min(len(first), len(second), _MAX_OVERLAP_CHARS), _MIN_OVERLAP_CHARS - 1, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return f"{first} {second}"
+
+
+def drop_near_duplicates(passages: list[dict], threshold: float) -> list[dict]:
+    # A passage is a duplicate when most of its word trigrams already appear
+    # in one better-ranked passage. Containment rather than Jaccard, so a
+    # single chunk repeating part of a merged passage is caught as well.
+    kept, kept_shingles = [], []
+    for passage in passages:
+        shingles = _shingles(passage["chunk_text"])
+        if any(_containment(shingles, other) >= threshold for other in kept_shingles):
+            continue
+        kept.append(passage)
+        kept_shingles.append(shingles)
+    return kept
+
+
+def fit_to_budget(blocks: list[str], budget: int) -> tuple[list[str], int]:
+    # Whole blocks in order; the first one that doesn't fit is cut at a word
+    # boundary if enough room is left, and everything after it is dropped.
+    fitted, used = [], 0
+    for block in blocks:
+        tokens = estimate_tokens(block)
+        if used + tokens <= budget:
+            fitted.append(block)
+            used += tokens
+            continue
+        room = budget - used
+        if room >= _MIN_TRUNCATED_TOKENS:
+            cut = block[:room * 4].rsplit(None, 1)[0] + " …"
+            fitted.append(cut)
+            used += estimate_tokens(cut)
+        break
+    return fitted, used
+
+
+def split_budget(total: int, graph_share: float, document_tokens: int, graph_tokens: int) -> tuple[int, int]:
+    # Each section is guaranteed its share; whatever one side doesn't need
+    # goes to the other.
+    graph_budget = int(total * graph_share)
+    document_budget = total - graph_budget
+    if graph_tokens < graph_budget:
+        document_budget += graph_budget - graph_tokens
+        graph_budget = graph_tokens
+    elif document_tokens < document_budget:
+        graph_budget += document_budget - document_tokens
+        document_budget = document_tokens
+    return document_budget, graph_budget
+
+
+def _shingles(text: str) -> set[tuple[str, ...]]:
+    words = _WORD.findall(text.lower())
+    if len(words) < 3:
+        return {tuple(words)}
+    return {tuple(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def _containment(part: set, whole: set) -> float:
+    return len(part & whole) / len(part) if part else 1.0
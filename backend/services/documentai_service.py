@@ -1,68 +1,158 @@
 import asyncio
+import re
+from typing import Callable, NamedTuple
 from google.cloud import documentai_v1 as documentai
+from services.pdf_service import (
+    PdfShard, PdfSource, split_pdf, extract_text_layer, text_layer_quality
+)
+from services.google_clients import documentai_processor_name, get_documentai_client, get_executor
+from services.chunker import page_bounds, layout_breaks, chunk_spans, materialize
 from config import get_settings
 
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+_LINE_BREAK = re.compile(r"\n")
 
-def _get_processor_name() -> str:
+
+# (zero-based page offset, Document AI result) for one OCR'd page range.
+OcrShard = tuple[int, documentai.Document]
+
+
+class PageText(NamedTuple):
+    # One page as a span of a text buffer: Document AI pages share their
+    # shard's document.text, text-layer pages carry their own string.
+    page_number: int
+    text: str
+    start: int
+    end: int
+    breaks: list[int]
+
+
+_ocr_semaphore: asyncio.Semaphore | None = None
+
+
+def _get_ocr_semaphore() -> asyncio.Semaphore:
+    # Shared across documents so concurrent uploads respect the same quota.
+    global _ocr_semaphore
+    if _ocr_semaphore is None:
+        _ocr_semaphore = asyncio.Semaphore(max(1, get_settings().documentai_max_concurrency))
+    return _ocr_semaphore
+
+
+async def extract_text_from_pdf(
+    pdf_bytes: PdfSource,
+    filename: str,
+    on_pages: Callable[[int, int], None] | None = None
+) -> list[dict]:
+    pages = await read_pages(pdf_bytes, on_pages=on_pages)
+    return split_into_chunks(pages, filename)
+
+
+async def read_pages(
+    pdf_bytes: PdfSource,
+    pages: list[int] | None = None,
+    client: documentai.DocumentProcessorServiceClient | None = None,
+    on_pages: Callable[[int, int], None] | None = None
+) -> list[PageText]:
+    # Born-digital pages are read from the PDF's own text layer; only pages
+    # that look scanned or garbled are sent to Document AI. `pages`
+    # (zero-based) restricts reading to those pages.
     settings = get_settings()
-    return (
-        f"projects/{settings.google_cloud_project}"
-        f"/locations/{settings.documentai_location}"
-        f"/processors/{settings.documentai_processor_id}"
-    )
+    if not settings.text_layer_fast_path:
+        return _ocr_pages(await process_pdf(pdf_bytes, pages=pages, client=client, on_pages=on_pages))
 
+    loop = asyncio.get_event_loop()
+    layer = await loop.run_in_executor(None, extract_text_layer, pdf_bytes, pages)
+    indices = pages if pages is not None else range(len(layer))
+    local_pages = []
+    scanned = []
+    for index, text in zip(indices, layer):
+        if text_layer_quality(text) >= settings.text_layer_min_quality:
+            local_pages.append(_text_layer_page(index + 1, text))
+        else:
+            scanned.append(index)
 
-async def extract_text_from_pdf(pdf_bytes: bytes, filename: str) -> list[dict]:
-    client = documentai.DocumentProcessorServiceClient()
-    processor_name = _get_processor_name()
+    if on_pages:
+        on_pages(len(local_pages), len(layer))
+    if not scanned:
+        return local_pages
 
-    raw_document = documentai.RawDocument(
-        content=pdf_bytes,
-        mime_type="application/pdf"
-    )
-    request = documentai.ProcessRequest(
-        name=processor_name,
-        raw_document=raw_document
-    )
+    def on_ocr_pages(done: int, total: int) -> None:
+        if on_pages:
+            on_pages(len(local_pages) + done, len(layer))
+
+    shards = await process_pdf(pdf_bytes, pages=scanned, client=client, on_pages=on_ocr_pages)
+    return sorted(local_pages + _ocr_pages(shards), key=lambda p: p.page_number)
+
+
+async def process_pdf(
+    pdf_bytes: PdfSource,
+    pages: list[int] | None = None,
+    client: documentai.DocumentProcessorServiceClient | None = None,
+    on_pages: Callable[[int, int], None] | None = None
+) -> list[OcrShard]:
+    settings = get_settings()
+    client = client or get_documentai_client()
+    processor_name = documentai_processor_name()
 
     loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(None, client.process_document, request)
+    pdf_shards = await loop.run_in_executor(
+        None, split_pdf, pdf_bytes, settings.documentai_shard_pages, pages
+    )
+    pages_total = sum(shard.page_count for shard in pdf_shards)
+    pages_done = 0
+
+    async def ocr_shard(shard: PdfShard) -> OcrShard:
+        nonlocal pages_done
+        request = documentai.ProcessRequest(
+            name=processor_name,
+            raw_document=documentai.RawDocument(
+                content=bytes(shard.content),
+                mime_type="application/pdf"
+            )
+        )
+        async with _get_ocr_semaphore():
+            result = await loop.run_in_executor(get_executor("documentai"), client.process_document, request)
+        pages_done += shard.page_count
+        if on_pages:
+            on_pages(pages_done, pages_total)
+        return shard.first_page, result.document
 
-    return _split_into_chunks(result.document, filename)
+    # gather keeps shard order, so pages come back in document order.
+    return list(await asyncio.gather(*(ocr_shard(shard) for shard in pdf_shards)))
 
 
-def _split_into_chunks(document, source_file: str) -> list[dict]:
+def split_into_chunks(pages: list[PageText], source_file: str) -> list[dict]:
     chunks = []
-    for page_num, page in enumerate(document.pages, start=1):
-        page_text = _extract_page_text(document.text, page)
-        if not page_text.strip():
-            continue
-        for sub in _chunk_text(page_text, max_chars=1500, overlap_chars=150):
+    for page in pages:
+        spans = chunk_spans(
+            page.text, page.start, page.end,
+            max_chars=1500,
+            overlap_chars=150,
+            breaks=page.breaks
+        )
+        for chunk_text in materialize(page.text, spans):
             chunks.append({
-                "page_number": page_num,
-                "chunk_text": sub,
+                "page_number": page.page_number,
+                "chunk_text": chunk_text,
                 "source_file": source_file
             })
     return chunks
 
 
-def _extract_page_text(full_text: str, page) -> str:
-    segments = []
-    for token in page.tokens:
-        for seg in token.layout.text_anchor.text_segments:
-            start = int(seg.start_index) if seg.start_index else 0
-            end = int(seg.end_index)
-            segments.append(full_text[start:end])
-    return " ".join(segments)
+def _ocr_pages(shards: list[OcrShard]) -> list[PageText]:
+    pages = []
+    for page_offset, document in shards:
+        for page_index, page in enumerate(document.pages, start=1):
+            bounds = page_bounds(page)
+            if bounds is None:
+                continue
+            pages.append(PageText(page_offset + page_index, document.text, *bounds, layout_breaks(page)))
+    return pages
 
 
-def _chunk_text(text: str, max_chars: int = 1500, overlap_chars: int = 150) -> list[str]:
-    if len(text) <= max_chars:
-        return [text]
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = start + max_chars
-        chunks.append(text[start:end])
-        start = end - overlap_chars
-    return chunks
+def _text_layer_page(page_number: int, text: str) -> PageText:
+    # Blank lines mark paragraphs in extracted text; fall back to line ends.
+    breaks = [m.end() for m in _PARAGRAPH_BREAK.finditer(text)]
+    if not breaks:
+        breaks = [m.end() for m in _LINE_BREAK.finditer(text)]
+    return PageText(page_number, text, 0, len(text), breaks)
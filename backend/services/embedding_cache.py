@@ -0,0 +1,149 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+
+class EmbeddingCache:
+    # Persistent (model, dims, sha256(text)) -> float32 vector store with
+    # least-recently-used eviction once max_entries is exceeded. Calls are
+    # blocking; async callers should run them in an executor.
+
+    def __init__(self, path: str, max_entries: int):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                dims INTEGER NOT NULL,
+                text_hash BLOB NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                UNIQUE (model, dims, text_hash)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        # Running row count, so puts don't scan the table. Another process
+        # sharing the file makes it drift; stats() re-counts.
+        self._entries = self._count()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(self, model: str, dims: int, texts: list[str]) -> list[list[float] | None]:
+        hashes = [_text_hash(t) for t in texts]
+        found: dict[bytes, list[float]] = {}
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            # Stay well under SQLite's bound-parameter limit.
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND dims = ? AND text_hash IN ({placeholders})",
+                    (model, dims, *batch)
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = _unpack(blob)
+            if found:
+                now = time.time()
+                with self._transaction():
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE model = ? AND dims = ? AND text_hash = ?",
+                        [(now, model, dims, h) for h in found]
+                    )
+            results = [found.get(h) for h in hashes]
+            hit_count = sum(1 for r in results if r is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model: str, dims: int, items: list[tuple[str, list[float]]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [(model, dims, _text_hash(text), _pack(vector), now) for text, vector in items]
+        with self._lock:
+            with self._transaction():
+                # Existing rows are refreshed first, so the insert's change
+                # count is exactly the number of new rows.
+                self._conn.executemany(
+                    "UPDATE embeddings SET vector = ?, last_used = ? WHERE model = ? AND dims = ? AND text_hash = ?",
+                    [(vector, used, m, d, h) for m, d, h, vector, used in rows]
+                )
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (model, dims, text_hash, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                entries = self._entries + self._conn.total_changes - before
+                overflow = entries - self._max_entries
+                if overflow > 0:
+                    self._conn.execute(
+                        "DELETE FROM embeddings WHERE rowid IN "
+                        "(SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                        (overflow,)
+                    )
+                    entries -= overflow
+            self._entries = entries
+            self.evictions += max(0, overflow)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._entries = self._count()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self._max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        # The connection is in autocommit mode; an error must not leave it
+        # inside an open transaction, or every later BEGIN fails.
+        self._conn.execute("BEGIN")
+        try:
+            yield
+            self._conn.execute("COMMIT")
+        except BaseException:
+            if self._conn.in_transaction:  # some errors roll back on their own
+                self._conn.execute("ROLLBACK")
+            raise
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+def _text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def _pack(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
@@ -1,7 +1,23 @@
+import asyncio
+from collections import OrderedDict
+from functools import partial
 from langchain_google_vertexai import VertexAIEmbeddings
+from services.embedding_cache import EmbeddingCache
+from services.google_clients import get_executor
 from config import get_settings
 
+_MODEL_NAME = "text-embedding-004"
+
 _embeddings: VertexAIEmbeddings | None = None
+_batchers: dict[str, "_MicroBatcher"] = {}
+_cache: EmbeddingCache | None = None
+# Query vectors by normalized text; skips the SQLite cache and the batcher
+# for questions asked over and over (dashboards, shift handovers).
+_query_vectors: OrderedDict[str, list[float]] = OrderedDict()
+_query_stats = {"hits": 0, "misses": 0}
+
+QUERY_TASK = "RETRIEVAL_QUERY"
+DOCUMENT_TASK = "RETRIEVAL_DOCUMENT"
 
 
 def _get_embeddings() -> VertexAIEmbeddings:
@@ -9,17 +25,186 @@ def _get_embeddings() -> VertexAIEmbeddings:
     if _embeddings is None:
         settings = get_settings()  # also sets GOOGLE_APPLICATION_CREDENTIALS env var
         _embeddings = VertexAIEmbeddings(
-            model_name="text-embedding-004",
+            model_name=_MODEL_NAME,
             project=settings.google_cloud_project
         )
     return _embeddings
 
 
+def _get_cache() -> EmbeddingCache | None:
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        if settings.embedding_cache_path:
+            _cache = EmbeddingCache(
+                settings.embedding_cache_path,
+                max_entries=settings.embedding_cache_max_entries
+            )
+    return _cache
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough English-text heuristic; good enough for request budgeting.
+    return max(1, len(text) // 4)
+
+
+# Coalesces texts from concurrent callers into bounded Vertex requests. Texts
+# wait up to window_ms for company; a batch flushes early once it hits the
+# size or token budget, and at most max_concurrency batches are in flight.
+class _MicroBatcher:
+    def __init__(
+        self,
+        task_type: str,
+        window_ms: float,
+        max_batch_size: int,
+        max_batch_tokens: int,
+        max_concurrency: int
+    ):
+        self._task_type = task_type
+        self._window = window_ms / 1000
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_batch_tokens = max(1, max_batch_tokens)
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def submit(self, texts: list[str]) -> list[list[float]]:
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._enqueue(text, future)
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+
+    def _enqueue(self, text: str, future: asyncio.Future) -> None:
+        tokens = estimate_tokens(text)
+        if self._pending and self._pending_tokens + tokens > self._max_batch_tokens:
+            self._flush()
+
+        self._pending.append((text, future))
+        self._pending_tokens += tokens
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self._window, self._flush)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        self._pending_tokens = 0
+        if batch:
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        live = [(text, future) for text, future in batch if not future.done()]
+        if not live:
+            return
+        async with self._semaphore:
+            try:
+                vectors = await self._send([text for text, _ in live])
+            except Exception as exc:
+                for _, future in live:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+        for (_, future), vector in zip(live, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    async def _send(self, texts: list[str]) -> list[list[float]]:
+        embeddings = _get_embeddings()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_executor("embeddings"),
+            partial(embeddings.embed_documents, texts, embeddings_task_type=self._task_type)
+        )
+
+
+def _get_batcher(task_type: str) -> _MicroBatcher:
+    if task_type not in _batchers:
+        settings = get_settings()
+        _batchers[task_type] = _MicroBatcher(
+            task_type,
+            window_ms=settings.embedding_batch_window_ms,
+            max_batch_size=settings.embedding_max_batch_size,
+            max_batch_tokens=settings.embedding_max_batch_tokens,
+            max_concurrency=settings.embedding_max_concurrency
+        )
+    return _batchers[task_type]
+
+
+async def _embed(texts: list[str], task_type: str) -> list[list[float]]:
+    cache = _get_cache()
+    if cache is None:
+        return await _get_batcher(task_type).submit(texts)
+
+    # Query and document embeddings differ for the same text, so the task
+    # type is part of the cached model name.
+    model = f"{_MODEL_NAME}:{task_type}"
+    dims = get_settings().qdrant_vector_size
+    loop = asyncio.get_running_loop()
+    vectors = await loop.run_in_executor(None, cache.get_many, model, dims, texts)
+
+    misses = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+    if misses:
+        fresh = await _get_batcher(task_type).submit(misses)
+        await loop.run_in_executor(None, cache.put_many, model, dims, list(zip(misses, fresh)))
+        by_text = dict(zip(misses, fresh))
+        vectors = [v if v is not None else by_text[t] for t, v in zip(texts, vectors)]
+    return vectors
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
 async def embed_text(text: str) -> list[float]:
-    embeddings = _get_embeddings()
-    return await embeddings.aembed_query(text)
+    key = normalize_query(text)
+    vector = _query_vectors.get(key)
+    if vector is not None:
+        _query_vectors.move_to_end(key)
+        _query_stats["hits"] += 1
+        return vector
+
+    _query_stats["misses"] += 1
+    vector = (await _embed([text.strip()], QUERY_TASK))[0]
+    _query_vectors[key] = vector
+    while len(_query_vectors) > max(0, get_settings().query_embedding_lru_size):
+        _query_vectors.popitem(last=False)
+    return vector
 
 
 async def embed_texts(texts: list[str]) -> list[list[float]]:
-    embeddings = _get_embeddings()
-    return await embeddings.aembed_documents(texts)
+    if not texts:
+        return []
+    return await _embed(texts, DOCUMENT_TASK)
+
+
+def embedding_cache_stats() -> dict:
+    cache = _get_cache()
+    return cache.stats() if cache else {}
+
+
+def query_embedding_stats() -> dict:
+    lookups = _query_stats["hits"] + _query_stats["misses"]
+    return {
+        "entries": len(_query_vectors),
+        **_query_stats,
+        "hit_rate": round(_query_stats["hits"] / lookups, 4) if lookups else 0.0
+    }
+
+
+def close_embedding_cache() -> None:
+    global _cache
+    if _cache:
+        _cache.close()
+        _cache = None
@@ -1,4 +1,6 @@
 import json
+from contextlib import aclosing
+from typing import AsyncIterator
 from google import genai
 from google.genai import types
 from config import get_settings
@@ -23,6 +25,20 @@ async def chat_complete(prompt: str) -> str:
     return response.text
 
 
+async def chat_complete_stream(prompt: str) -> AsyncIterator[str]:
+    # Yields text as Gemini produces it; closing the generator closes the
+    # underlying HTTP stream.
+    client = _get_client()
+    stream = await client.aio.models.generate_content_stream(
+        model="gemini-2.5-flash",
+        contents=prompt
+    )
+    async with aclosing(stream):
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
+
 async def extract_knowledge_observation(transcript: str) -> dict:
     client = _get_client()
     prompt = _build_ner_prompt(transcript)
@@ -33,6 +49,35 @@ async def extract_knowledge_observation(transcript: str) -> dict:
     return _parse_ner_response(response.text)
 
 
+async def extract_issue_and_mitigation(transcript: str, asset_tag: str) -> dict:
+    # Reduced extraction for transcripts whose asset tag is already known
+    # from the dictionary match: shorter prompt, no tag reasoning.
+    client = _get_client()
+    response = await client.aio.models.generate_content(
+        model="gemini-2.5-flash",
+        contents=_build_issue_prompt(transcript, asset_tag)
+    )
+    extracted = _parse_ner_response(response.text)
+    extracted["target_asset_tag"] = asset_tag
+    return extracted
+
+
+def _build_issue_prompt(transcript: str, asset_tag: str) -> str:
+    return f"""Extract the observation from this field operator voice note about asset {asset_tag}.
+
+TRANSCRIPT:
+{transcript}
+
+Return ONLY a valid JSON object with exactly these fields:
+{{
+  "observed_issue": "<concise description of the problem or observation>",
+  "mitigation_action": "<what was done or recommended, or null>",
+  "confidence_index": <float 0.0-1.0 indicating extraction confidence>
+}}
+
+JSON:"""
+
+
 def _build_ner_prompt(transcript: str) -> str:
     return f"""You are an industrial equipment knowledge extractor for a manufacturing plant.
 Extract structured information from this field operator voice note.
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import grpc
+from google.auth.transport.requests import Request
+from google.cloud import documentai_v1 as documentai
+from google.cloud import speech_v1 as speech
+from config import get_settings
+
+# Long-lived Google SDK clients, created and warmed once in the app lifespan,
+# plus one sized thread pool per blocking SDK so OCR, speech and embedding
+# calls don't queue behind each other on the default executor. Scripts that
+# skip the lifespan get the same objects lazily on first use.
+
+_WARMUP_TIMEOUT_S = 10.0
+
+_documentai_client: documentai.DocumentProcessorServiceClient | None = None
+_speech_client: speech.SpeechClient | None = None
+_executors: dict[str, "InstrumentedExecutor"] = {}
+_lock = threading.Lock()
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    # Tracks queued vs running calls and cumulative busy time so /metrics can
+    # show whether a pool is saturated.
+
+    def __init__(self, name: str, max_workers: int):
+        super().__init__(max_workers=max_workers, thread_name_prefix=f"paperbrain-{name}")
+        self.name = name
+        self.workers = max_workers
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._busy_seconds = 0.0
+        self._created = time.monotonic()
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._stats_lock:
+            self._queued += 1
+
+        def run():
+            with self._stats_lock:
+                self._queued -= 1
+                self._active += 1
+            started = time.monotonic()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._stats_lock:
+                    self._active -= 1
+                    self._completed += 1
+                    self._busy_seconds += time.monotonic() - started
+
+        return super().submit(run)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            elapsed = max(time.monotonic() - self._created, 1e-9)
+            return {
+                "workers": self.workers,
+                "active": self._active,
+                "queue_depth": self._queued,
+                "completed": self._completed,
+                "utilization": round(self._busy_seconds / (elapsed * self.workers), 4)
+            }
+
+
+def _executor_sizes() -> dict[str, int]:
+    settings = get_settings()
+    return {
+        "documentai": settings.documentai_executor_workers,
+        # A streaming recognition holds its thread for the whole clip.
+        "speech": settings.speech_executor_workers,
+        "embeddings": settings.embedding_executor_workers
+    }
+
+
+def get_executor(name: str) -> InstrumentedExecutor:
+    executor = _executors.get(name)
+    if executor is None:
+        with _lock:
+            executor = _executors.get(name)
+            if executor is None:
+                executor = InstrumentedExecutor(name, max(1, _executor_sizes()[name]))
+                _executors[name] = executor
+    return executor
+
+
+def documentai_processor_name() -> str:
+    settings = get_settings()
+    return (
+        f"projects/{settings.google_cloud_project}"
+        f"/locations/{settings.documentai_location}"
+        f"/processors/{settings.documentai_processor_id}"
+    )
+
+
+def get_documentai_client() -> documentai.DocumentProcessorServiceClient:
+    global _documentai_client
+    if _documentai_client is None:
+        with _lock:
+            if _documentai_client is None:
+                _documentai_client = documentai.DocumentProcessorServiceClient()
+    return _documentai_client
+
+
+def get_speech_client() -> speech.SpeechClient:
+    global _speech_client
+    if _speech_client is None:
+        with _lock:
+            if _speech_client is None:
+                _speech_client = speech.SpeechClient()
+    return _speech_client
+
+
+async def init_google_clients() -> None:
+    loop = asyncio.get_running_loop()
+    for name in _executor_sizes():
+        get_executor(name)
+    await asyncio.gather(
+        loop.run_in_executor(get_executor("documentai"), _warm_documentai),
+        loop.run_in_executor(get_executor("speech"), _warm_speech)
+    )
+
+
+def _warm_documentai() -> None:
+    # get_processor is the cheapest authenticated call: it opens the channel,
+    # fetches a token and checks the processor id in one round trip.
+    try:
+        get_documentai_client().get_processor(name=documentai_processor_name(), timeout=_WARMUP_TIMEOUT_S)
+        print("[Paper Brain] Document AI client ready")
+    except Exception as e:
+        print(f"[Paper Brain] Document AI warmup failed (will retry on first use): {e}")
+
+
+def _warm_speech() -> None:
+    # Speech has no cheap read call; connecting the channel and refreshing
+    # credentials covers the setup a first request would otherwise pay.
+    try:
+        client = get_speech_client()
+        grpc.channel_ready_future(client.transport.grpc_channel).result(timeout=_WARMUP_TIMEOUT_S)
+        credentials = client.transport._credentials
+        if credentials is not None and not credentials.valid:
+            credentials.refresh(Request())
+        print("[Paper Brain] Speech client ready")
+    except Exception as e:
+        print(f"[Paper Brain] Speech warmup failed (will retry on first use): {e}")
+
+
+def executor_stats() -> dict:
+    return {name: executor.stats() for name, executor in _executors.items()}
+
+
+async def close_google_clients() -> None:
+    global _documentai_client, _speech_client
+    for client in (_documentai_client, _speech_client):
+        if client is not None:
+            client.transport.close()
+    _documentai_client = None
+    _speech_client = None
+    for executor in _executors.values():
+        executor.shutdown(wait=False, cancel_futures=True)
+    _executors.clear()
@@ -0,0 +1,130 @@
+import hashlib
+import io
+import mmap
+from typing import NamedTuple
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import IndirectObject
+
+# Raw PDF content: in-memory bytes or a read-only memory map of a spooled upload.
+PdfSource = bytes | mmap.mmap
+
+_TEXT_PUNCTUATION = set(".,;:!?()[]{}%/+-–—=*'\"#&°<>|_@")
+
+
+class PdfShard(NamedTuple):
+    first_page: int  # zero-based index of the shard's first page in the source PDF
+    page_count: int
+    content: PdfSource
+
+
+def split_pdf(
+    pdf_bytes: PdfSource,
+    pages_per_shard: int,
+    pages: list[int] | None = None
+) -> list[PdfShard]:
+    # `pages` (zero-based) restricts the shards to those pages; contiguous
+    # runs are kept together so each shard still maps to one page offset.
+    # A whole document that fits in one shard is passed through untouched.
+    reader = PdfReader(_stream(pdf_bytes))
+    total_pages = len(reader.pages)
+    pages_per_shard = max(1, pages_per_shard)
+    if pages is None and total_pages <= pages_per_shard:
+        return [PdfShard(0, total_pages, pdf_bytes)]
+
+    shards = []
+    for run_start, run_end in _page_runs(pages if pages is not None else range(total_pages)):
+        for start in range(run_start, run_end, pages_per_shard):
+            end = min(start + pages_per_shard, run_end)
+            writer = PdfWriter()
+            for index in range(start, end):
+                writer.add_page(reader.pages[index])
+            buffer = io.BytesIO()
+            writer.write(buffer)
+            shards.append(PdfShard(start, end - start, buffer.getvalue()))
+    return shards
+
+
+def extract_text_layer(pdf_bytes: PdfSource, pages: list[int] | None = None) -> list[str]:
+    # Embedded text per page (or per requested zero-based page, in order);
+    # scanned or broken pages come back empty.
+    reader = PdfReader(_stream(pdf_bytes))
+    indices = pages if pages is not None else range(len(reader.pages))
+    texts = []
+    for index in indices:
+        try:
+            texts.append(reader.pages[index].extract_text() or "")
+        except Exception:
+            texts.append("")
+    return texts
+
+
+def page_fingerprints(pdf_bytes: PdfSource) -> list[str]:
+    # One hash per page over what the page draws: geometry, content streams
+    # and referenced XObjects (images, forms). Pages left alone in a revised
+    # export keep their hash even when other pages change.
+    reader = PdfReader(_stream(pdf_bytes))
+    return [_page_fingerprint(page) for page in reader.pages]
+
+
+def text_layer_quality(text: str, min_chars: int = 20) -> float:
+    # 0.0-1.0: share of characters that are ordinary text, times the share of
+    # tokens that look like words. Scanned pages score 0 (no text layer);
+    # broken font maps score low on both (glyph soup, "(cid:12)" runs, U+FFFD).
+    stripped = text.strip()
+    if len(stripped) < min_chars or "\ufffd" in stripped or "(cid:" in stripped:
+        return 0.0
+    ordinary = sum(1 for ch in stripped if ch.isalnum() or ch.isspace() or ch in _TEXT_PUNCTUATION)
+    tokens = stripped.split()
+    wordlike = sum(1 for t in tokens if len(t) <= 30 and any(ch.isalnum() for ch in t))
+    return (ordinary / len(stripped)) * (wordlike / len(tokens))
+
+
+def _stream(pdf_bytes: PdfSource):
+    # mmap already behaves like a seekable file, so it is read in place.
+    return pdf_bytes if isinstance(pdf_bytes, mmap.mmap) else io.BytesIO(pdf_bytes)
+
+
+def _page_fingerprint(page) -> str:
+    digest = hashlib.sha256()
+    digest.update(repr((list(page.mediabox), page.get("/Rotate", 0))).encode())
+    contents = page.get("/Contents")
+    if contents is not None:
+        contents = contents.get_object()
+        for stream in contents if isinstance(contents, list) else [contents]:
+            digest.update(_raw_data(stream.get_object()))
+    _hash_xobjects(page.get("/Resources"), digest, set())
+    return digest.hexdigest()
+
+
+def _hash_xobjects(resources, digest, seen: set[int]) -> None:
+    # Form XObjects can nest (and, in broken files, loop), so track visits.
+    if resources is None:
+        return
+    xobjects = resources.get_object().get("/XObject")
+    if xobjects is None:
+        return
+    for name, ref in sorted(xobjects.get_object().items()):
+        if isinstance(ref, IndirectObject):
+            if ref.idnum in seen:
+                continue
+            seen.add(ref.idnum)
+        xobject = ref.get_object()
+        digest.update(name.encode())
+        digest.update(_raw_data(xobject))
+        _hash_xobjects(xobject.get("/Resources"), digest, seen)
+
+
+def _raw_data(stream) -> bytes:
+    # Encoded stream bytes: hashing them avoids inflating every image.
+    data = getattr(stream, "_data", None)
+    return data if isinstance(data, bytes) else stream.get_data()
+
+
+def _page_runs(pages) -> list[tuple[int, int]]:
+    runs: list[tuple[int, int]] = []
+    for page in sorted(pages):
+        if runs and runs[-1][1] == page:
+            runs[-1] = (runs[-1][0], page + 1)
+        else:
+            runs.append((page, page + 1))
+    return runs
@@ -0,0 +1,58 @@
+import re
+import zlib
+from collections import Counter
+from qdrant_client.models import SparseVector
+
+# Locally computed sparse vectors for exact-term matching next to the dense
+# embeddings. Documents carry BM25 term-frequency weights; Qdrant applies the
+# IDF half itself (Modifier.IDF on the sparse vector config), so the weights
+# never need recomputing as the corpus grows. Terms hash to uint32 indices
+# with crc32, so there is no vocabulary to store or keep in sync.
+
+# Codes stay whole: "XR-900", "WO-2019-0847", "T-EXT-044", "3/4", "1.5".
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-/.][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were will with what which how when where who why does do".split()
+)
+_K1 = 1.2
+_B = 0.75
+_AVG_DOC_TOKENS = 220  # typical 1500-char chunk from chunk_spans
+
+
+def tokenize(text: str) -> list[str]:
+    # A code also contributes its parts, so "XR 900" still meets "XR-900";
+    # the whole code is the rarer term and dominates once IDF applies.
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        tokens.append(token)
+        parts = re.split(r"[-/.]", token)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part not in _STOPWORDS)
+    return tokens
+
+
+def encode_document(text: str) -> SparseVector:
+    tokens = tokenize(text)
+    norm = _K1 * (1 - _B + _B * len(tokens) / _AVG_DOC_TOKENS)
+    weights: dict[int, float] = {}
+    for token, tf in Counter(tokens).items():
+        index = term_index(token)
+        weights[index] = weights.get(index, 0.0) + tf * (_K1 + 1) / (tf + norm)
+    return _sparse(weights)
+
+
+def encode_query(text: str) -> SparseVector:
+    # Each query term counts once; the document side carries the TF weight.
+    return _sparse({term_index(token): 1.0 for token in set(tokenize(text))})
+
+
+def term_index(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def _sparse(weights: dict[int, float]) -> SparseVector:
+    indices = sorted(weights)
+    return SparseVector(indices=indices, values=[weights[i] for i in indices])
@@ -1,12 +1,23 @@
 import asyncio
+import mmap
+import threading
+from typing import AsyncIterator, NamedTuple
 from google.cloud import speech_v1 as speech
+from services.google_clients import get_executor, get_speech_client
 
+# Audio is streamed in frames of this size; Google recommends ~100ms of
+# audio per request, and 16KB covers that for Opus at any sensible bitrate.
+_STREAM_FRAME_BYTES = 16 * 1024
+_END = object()
 
-async def transcribe_audio(audio_bytes: bytes) -> str:
-    client = speech.SpeechClient()
 
-    audio = speech.RecognitionAudio(content=audio_bytes)
-    config = speech.RecognitionConfig(
+class TranscriptSegment(NamedTuple):
+    text: str
+    is_final: bool
+
+
+def _recognition_config() -> speech.RecognitionConfig:
+    return speech.RecognitionConfig(
         encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
         sample_rate_hertz=48000,
         language_code="en-IN",
@@ -14,15 +25,67 @@ async def transcribe_audio(audio_bytes: bytes) -> str:
         model="latest_long"
     )
 
-    loop = asyncio.get_event_loop()
-    response = await loop.run_in_executor(
-        None,
-        lambda: client.recognize(config=config, audio=audio)
-    )
 
-    transcript = " ".join(
-        result.alternatives[0].transcript
-        for result in response.results
-        if result.alternatives
+async def transcribe_audio(
+    audio_bytes: bytes | mmap.mmap,
+    client: speech.SpeechClient | None = None
+) -> str:
+    # Streaming has no 60s clip limit, unlike recognize(); only final
+    # segments make up the transcript.
+    segments = [
+        segment.text.strip()
+        async for segment in transcribe_audio_stream(audio_bytes, client)
+        if segment.is_final
+    ]
+    return " ".join(s for s in segments if s)
+
+
+async def transcribe_audio_stream(
+    audio_bytes: bytes | mmap.mmap,
+    client: speech.SpeechClient | None = None
+) -> AsyncIterator[TranscriptSegment]:
+    # streaming_recognize is a blocking gRPC iterator, so it runs on a worker
+    # thread that hands each result back to the loop as it arrives. Interim
+    # results are yielded too; callers that only want text keep is_final.
+    client = client or get_speech_client()
+    loop = asyncio.get_running_loop()
+    results: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    streaming_config = speech.StreamingRecognitionConfig(
+        config=_recognition_config(),
+        interim_results=True
     )
-    return transcript.strip()
+
+    def frames():
+        for start in range(0, len(audio_bytes), _STREAM_FRAME_BYTES):
+            if stop.is_set():
+                return
+            yield speech.StreamingRecognizeRequest(
+                audio_content=bytes(audio_bytes[start:start + _STREAM_FRAME_BYTES])
+            )
+
+    def recognize() -> None:
+        try:
+            for response in client.streaming_recognize(config=streaming_config, requests=frames()):
+                for result in response.results:
+                    if result.alternatives:
+                        segment = TranscriptSegment(result.alternatives[0].transcript, result.is_final)
+                        loop.call_soon_threadsafe(results.put_nowait, segment)
+                if stop.is_set():
+                    break
+        except Exception as exc:
+            loop.call_soon_threadsafe(results.put_nowait, exc)
+        finally:
+            loop.call_soon_threadsafe(results.put_nowait, _END)
+
+    worker = loop.run_in_executor(get_executor("speech"), recognize)
+    try:
+        while (item := await results.get()) is not _END:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # The worker reads audio_bytes, which may be an mmap the caller closes
+        # as soon as we return, so wait for it to let go.
+        stop.set()
+        await worker
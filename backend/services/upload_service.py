@@ -0,0 +1,68 @@
+import mmap
+import os
+from contextlib import contextmanager
+from typing import Iterator
+from fastapi import UploadFile
+
+_READ_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+async def spool_upload(file: UploadFile, path: str, max_bytes: int) -> int:
+    # Copies the upload to `path` one chunk at a time so the whole file is
+    # never held in memory; stops as soon as max_bytes is crossed. This is a
+    # second write of a file Starlette has already spooled, but that spool
+    # is an anonymous temp file closed with the request, and a queued job
+    # has to outlive the request (and a restart). The copy is bounded by
+    # max_bytes and reads the spool back from the page cache.
+    size = 0
+    try:
+        with open(path, "wb") as out:
+            while chunk := await file.read(_READ_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                out.write(chunk)
+    except BaseException:
+        _remove(path)
+        raise
+    return size
+
+
+@contextmanager
+def mapped_file(path: str) -> Iterator[mmap.mmap | bytes]:
+    # Read-only memory map: pages are file-backed, so several concurrent
+    # uploads don't each pin a private copy in RSS.
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""  # mmap refuses zero-length files
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+@contextmanager
+def mapped_upload(file: UploadFile, max_bytes: int) -> Iterator[mmap.mmap | bytes]:
+    # Like mapped_file, but maps Starlette's own spooled copy of the upload,
+    # so a request-scoped file isn't written to disk a second time.
+    # fileno() rolls a small in-memory spool over to its temp file.
+    fd = file.file.fileno()
+    file.file.flush()
+    size = os.fstat(fd).st_size
+    if size > max_bytes:
+        raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+    if size == 0:
+        yield b""  # mmap refuses zero-length files
+        return
+    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests import backend modules the way the app does (from backend/), and
+# Settings needs its required fields; nothing here reaches Google or Neo4j.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for _key in ("GOOGLE_API_KEY", "GOOGLE_CLOUD_PROJECT", "GOOGLE_APPLICATION_CREDENTIALS",
+             "DOCUMENTAI_PROCESSOR_ID", "NEO4J_URI", "NEO4J_USER", "NEO4J_PASSWORD"):
+    os.environ.setdefault(_key, "test")
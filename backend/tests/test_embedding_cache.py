@@ -0,0 +1,41 @@
+import sqlite3
+import pytest
+
+from services.embedding_cache import EmbeddingCache
+
+MODEL = "text-embedding-004"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite3"), max_entries=3)
+    yield cache
+    cache.close()
+
+
+def test_failed_put_leaves_the_cache_usable(cache):
+    # Stands in for a disk-full or locked-database error halfway through.
+    cache._conn.execute(
+        "CREATE TRIGGER fail_insert BEFORE INSERT ON embeddings WHEN NEW.dims = 999 "
+        "BEGIN SELECT RAISE(ABORT, 'database or disk is full'); END"
+    )
+    cache.put_many(MODEL, 8, [("seal", [0.5] * 8)])
+    with pytest.raises(sqlite3.DatabaseError):
+        cache.put_many(MODEL, 999, [("gland", [0.25] * 8)])
+
+    assert not cache._conn.in_transaction
+    cache.put_many(MODEL, 8, [("packing", [0.75] * 8)])
+    assert cache.get_many(MODEL, 8, ["seal", "packing", "gland"]) == [[0.5] * 8, [0.75] * 8, None]
+    assert cache.stats()["entries"] == 2
+
+
+def test_running_count_drives_eviction(cache):
+    cache.put_many(MODEL, 8, [("a", [0.0] * 8), ("b", [0.0] * 8)])
+    cache.put_many(MODEL, 8, [("a", [1.0] * 8), ("a", [1.0] * 8)])  # update, not a new row
+    assert cache._entries == 2
+    assert cache.get_many(MODEL, 8, ["a"]) == [[1.0] * 8]
+
+    cache.put_many(MODEL, 8, [("c", [0.0] * 8), ("d", [0.0] * 8), ("e", [0.0] * 8)])
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (3, 2)
+    assert cache._entries == 3
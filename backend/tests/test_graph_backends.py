@@ -0,0 +1,81 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+
+import pipelines.graphrag_pipeline as graphrag
+from config import get_settings
+from database.topology_cache import DOWNSTREAM, UPSTREAM, TopologyGraph
+
+TOPOLOGY = TopologyGraph(
+    {"V-20": {"tag_number": "V-20"}, "P-101": {"tag_number": "P-101"}, "B-04": {"tag_number": "B-04"}},
+    {("V-20", "P-101"), ("P-101", "B-04")}
+)
+
+
+class _Records:
+    def __init__(self, records):
+        self._records = records
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for record in self._records:
+            yield record
+
+
+class FakeSession:
+    # Answers the three queries retrieve_from_neo4j can send the way Neo4j
+    # would for TOPOLOGY: unknown tags match no Asset, so they yield no row.
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, tags=None, max_fanout=None, max_paths=None):
+        known = [tag for tag in tags or [] if tag in TOPOLOGY]
+        if "downstream_paths" in query:
+            limits = (get_settings().graph_cascade_depth, max_fanout, max_paths)
+            return _Records([
+                {
+                    "a": TOPOLOGY.assets[tag],
+                    "downstream_paths": TOPOLOGY.paths(tag, DOWNSTREAM, *limits),
+                    "upstream_paths": TOPOLOGY.paths(tag, UPSTREAM, *limits),
+                    "observations": []
+                }
+                for tag in known
+            ])
+        if "HAS_OBSERVATION" in query:
+            return _Records([{"tag": tag, "observations": []} for tag in known])
+        return _Records([{"source": s, "target": t} for s, t in sorted(TOPOLOGY.edges)[:20]])
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    async def get_driver():
+        return SimpleNamespace(session=FakeSession)
+
+    monkeypatch.setattr(graphrag, "get_driver", get_driver)
+    monkeypatch.setattr(graphrag, "get_topology", lambda: TOPOLOGY)
+
+    def retrieve(backend, query):
+        monkeypatch.setattr(get_settings(), "graph_backend", backend)
+        return asyncio.run(graphrag.retrieve_from_neo4j({"query": query}))["graph_results"]
+
+    return retrieve
+
+
+@pytest.mark.parametrize("query", [
+    "What fails if XR-900 fails?",
+    "What happens downstream if P-101 trips?",
+    "Does XR-900 on P-101 feed B-04?",
+    "Which assets are connected?",
+])
+def test_memory_backend_matches_neo4j(backends, query):
+    assert backends("memory", query) == backends("neo4j", query)
+
+
+def test_unknown_tag_gets_no_graph_context(backends):
+    assert backends("memory", "What fails if XR-900 fails?") == []
@@ -0,0 +1,178 @@
+import asyncio
+import pytest
+from qdrant_client import AsyncQdrantClient
+
+import database.qdrant_client as qdrant
+import pipelines.ingestion_pipeline as ingestion
+from config import get_settings
+from services.documentai_service import PageText
+
+DIM = 8
+
+
+class FakeNeo4j:
+    # Just enough of the async driver for the DocumentChunk writes and the
+    # "already stored" lookup. fail_writes makes the next N batches raise.
+
+    def __init__(self, assets=()):
+        self.assets = set(assets)
+        self.chunks: set[str] = set()
+        self.links: set[tuple[str, str]] = set()
+        self.fail_writes = 0
+
+    def session(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute_write(self, fn, rows, tag):
+        if fn is ingestion._relink_chunk_batch:
+            self.links = {(t, i) for t, i in self.links if i not in rows or t == tag}
+            if tag in self.assets:
+                self.links |= {(tag, i) for i in rows if i in self.chunks}
+            return None
+        if self.fail_writes:
+            self.fail_writes -= 1
+            raise RuntimeError("neo4j unavailable")
+        self.chunks |= {row["id"] for row in rows}
+        if tag in self.assets:
+            self.links |= {(tag, row["id"]) for row in rows}
+            return len(rows)
+        return 0
+
+    async def run(self, query, ids, tag):
+        assert "RETURN dc.id AS id" in query
+        found = [
+            {"id": i} for i in ids
+            if i in self.chunks and (tag not in self.assets or (tag, i) in self.links)
+        ]
+        return _Records(found)
+
+
+class _Records:
+    def __init__(self, records):
+        self._records = records
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for record in self._records:
+            yield record
+
+
+@pytest.fixture
+def stores(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "qdrant_vector_size", DIM)
+    monkeypatch.setattr(settings, "qdrant_collection_name", "test_ingest_resume")
+    client = AsyncQdrantClient(":memory:")
+    neo4j = FakeNeo4j(assets={"P-101"})
+
+    async def get_qdrant_client():
+        return client
+
+    async def get_driver():
+        return neo4j
+
+    async def embed_texts(texts):
+        return [[1.0] + [0.0] * (DIM - 1) for _ in texts]
+
+    monkeypatch.setattr(ingestion, "get_qdrant_client", get_qdrant_client)
+    monkeypatch.setattr(ingestion, "get_driver", get_driver)
+    monkeypatch.setattr(ingestion, "embed_texts", embed_texts)
+    asyncio.run(qdrant._ensure_collection(client, settings))
+    return client, neo4j
+
+
+def _chunks(count=6):
+    return [
+        {"source_file": "manual.pdf", "page_number": 1 + i // 3, "chunk_text": f"Chunk {i} of the seal procedure."}
+        for i in range(count)
+    ]
+
+
+async def _ingest(asset_tag=None):
+    new_chunks, skipped = await ingestion.select_new_chunks(_chunks(), asset_tag)
+    if new_chunks:
+        vectors = await ingestion._embed_chunks([c["chunk_text"] for c in new_chunks], None)
+        await ingestion.store_chunks(new_chunks, vectors, asset_tag)
+    return len(new_chunks), skipped
+
+
+def test_retry_rewrites_chunks_missing_from_neo4j(stores):
+    client, neo4j = stores
+    neo4j.fail_writes = 1
+    with pytest.raises(RuntimeError):
+        asyncio.run(_ingest())
+    # Qdrant got every point; Neo4j got none.
+    assert len(neo4j.chunks) == 0
+
+    written, skipped = asyncio.run(_ingest())
+    assert (written, skipped) == (6, 0)
+    assert len(neo4j.chunks) == 6
+
+    assert asyncio.run(_ingest()) == (0, 6)
+
+
+def test_reingest_under_new_tag_links_the_asset(stores):
+    _, neo4j = stores
+    asyncio.run(_ingest())
+    assert asyncio.run(_ingest("P-101")) == (6, 0)
+    assert len(neo4j.links) == 6
+    assert asyncio.run(_ingest("P-101")) == (0, 6)
+    # A tag with no Asset node has nothing to link, so nothing is re-sent.
+    assert asyncio.run(_ingest("X-999")) == (0, 6)
+
+
+def test_reingest_under_new_tag_retags_unchanged_chunks(stores, monkeypatch):
+    client, neo4j = stores
+    neo4j.assets.add("P-202")
+    page_text = "Replace the mechanical seal every 4000 hours. Check the gland packing weekly."
+    invalidated = []
+
+    async def read_pages(pdf_bytes, pages=None, on_pages=None):
+        return [PageText(i + 1, page_text, 0, len(page_text), []) for i in (pages or [0, 1])]
+
+    monkeypatch.setattr(ingestion, "page_fingerprints", lambda pdf_bytes: ["h1", "h2"])
+    monkeypatch.setattr(ingestion, "read_pages", read_pages)
+    monkeypatch.setattr(ingestion, "invalidate_answers", lambda sources, assets: invalidated.append(assets))
+
+    first = asyncio.run(ingestion.reingest_document(b"%PDF", "manual.pdf", "P-101"))
+    assert first["chunks_stored"] == 2
+    assert {tag for tag, _ in neo4j.links} == {"P-101"}
+
+    # Same pages, new tag: nothing is re-read or re-embedded, but every
+    # kept chunk moves to P-202 in both stores.
+    second = asyncio.run(ingestion.reingest_document(b"%PDF", "manual.pdf", "P-202"))
+    assert (second["chunks_stored"], second["chunks_skipped"]) == (0, 2)
+    records, _ = asyncio.run(client.scroll(get_settings().qdrant_collection_name, with_payload=["asset_tag"]))
+    assert {r.payload["asset_tag"] for r in records} == {"P-202"}
+    assert {tag for tag, _ in neo4j.links} == {"P-202"}
+    assert len(neo4j.links) == 2
+    assert invalidated[-1] == {"P-101", "P-202"}
+
+
+def test_last_upsert_waits_after_the_others_are_acknowledged(stores, monkeypatch):
+    client, _ = stores
+    monkeypatch.setattr(get_settings(), "qdrant_upsert_batch_size", 2)
+    upsert = client.upsert
+    calls = []
+
+    async def recording_upsert(collection_name, points, wait):
+        calls.append(("start", len(points), wait))
+        result = await upsert(collection_name=collection_name, points=points, wait=wait)
+        calls.append(("done", len(points), wait))
+        return result
+
+    monkeypatch.setattr(client, "upsert", recording_upsert)
+    asyncio.run(_ingest())
+
+    # Overwrites of existing ids included: the wait=True batch only goes
+    # out once every wait=False batch has been acknowledged.
+    assert [wait for event, _, wait in calls if event == "start"] == [False, False, True]
+    assert calls[-2:] == [("start", 2, True), ("done", 2, True)]
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+
+import pipelines.graphrag_pipeline as graphrag
+import services.answer_cache as answer_cache
+from config import get_settings
+
+EMBED_S = 0.08
+NEO4J_S = 0.06
+GRAPH_QUESTION = "What happens downstream if P-101 trips?"
+
+
+class _Records:
+    def __init__(self, records):
+        self._records = records
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for record in self._records:
+            yield record
+
+
+class FakeSession:
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, **params):
+        self.calls["neo4j"] += 1
+        await asyncio.sleep(self.calls["neo4j_s"])
+        self.calls["neo4j_done"] += 1
+        return _Records([{
+            "a": {"tag_number": "P-101"},
+            "downstream_paths": [["P-101", "B-04"]],
+            "upstream_paths": [],
+            "observations": []
+        }])
+
+
+@pytest.fixture
+def stand_ins(monkeypatch):
+    calls = {"embed": 0, "neo4j": 0, "neo4j_done": 0, "llm": 0, "neo4j_s": NEO4J_S}
+    monkeypatch.setattr(get_settings(), "answer_cache_max_entries", 16)
+    monkeypatch.setattr(answer_cache, "_cache", None)
+
+    async def embed_text(text):
+        calls["embed"] += 1
+        await asyncio.sleep(EMBED_S)
+        return [1.0, 0.0, 0.0]
+
+    async def get_driver():
+        return SimpleNamespace(session=lambda: FakeSession(calls))
+
+    async def chat_complete(prompt):
+        calls["llm"] += 1
+        return "B-04 loses feed."
+
+    monkeypatch.setattr(graphrag, "embed_text", embed_text)
+    monkeypatch.setattr(graphrag, "get_driver", get_driver)
+    monkeypatch.setattr(graphrag, "chat_complete", chat_complete)
+    return calls
+
+
+async def _timed(query):
+    started = time.perf_counter()
+    result = await graphrag.run_query(query)
+    return result, time.perf_counter() - started
+
+
+def test_miss_does_not_wait_for_embedding_before_retrieval(stand_ins):
+    result, elapsed = asyncio.run(_timed(GRAPH_QUESTION))
+    assert not result["cached"]
+    # Neo4j runs alongside the embedding instead of after it.
+    assert elapsed < EMBED_S + NEO4J_S
+    assert stand_ins["neo4j_done"] == 1
+
+
+def test_hit_skips_the_answer_and_cancels_retrieval(stand_ins):
+    async def scenario():
+        await graphrag.run_query(GRAPH_QUESTION)
+        stand_ins["neo4j_s"] = 1.0  # still running when the hit is found
+        result, elapsed = await _timed(GRAPH_QUESTION)
+        await asyncio.sleep(0.05)
+        return result, elapsed
+
+    result, elapsed = asyncio.run(scenario())
+    assert result["cached"]
+    assert result["answer"] == "B-04 loses feed."
+    assert elapsed < 0.5
+    assert stand_ins["neo4j"] == 2
+    assert stand_ins["neo4j_done"] == 1  # the second lookup was cancelled
+    assert stand_ins["llm"] == 1
+
+
+def test_fast_retrieval_does_not_generate_before_the_cache_answers(stand_ins):
+    # Neo4j beats the embedding here; Gemini must still wait for the lookup.
+    async def scenario():
+        await graphrag.run_query(GRAPH_QUESTION)
+        return await graphrag.run_query(GRAPH_QUESTION)
+
+    assert asyncio.run(scenario())["cached"]
+    assert stand_ins["llm"] == 1
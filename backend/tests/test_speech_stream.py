@@ -0,0 +1,150 @@
+import asyncio
+import mmap
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+
+import pipelines.voice_pipeline as voice
+from config import get_settings
+from services.speech_service import TranscriptSegment, transcribe_audio, transcribe_audio_stream
+
+AUDIO = b"\x01" * (64 * 1024)  # four 16KB frames
+
+
+def _response(text: str, is_final: bool):
+    return SimpleNamespace(results=[
+        SimpleNamespace(alternatives=[SimpleNamespace(transcript=text)], is_final=is_final)
+    ])
+
+
+class FakeSpeechClient:
+    # Stands in for speech.SpeechClient.streaming_recognize: consumes one
+    # request per scripted step, then yields that step's responses. A step
+    # may be an Exception to raise, or a callable to run on the worker thread.
+
+    def __init__(self, script):
+        self.script = script
+        self.frames = 0
+        self.frame_errors: list[Exception] = []
+        self.finished = threading.Event()
+
+    def streaming_recognize(self, config, requests):
+        requests = iter(requests)
+        try:
+            for step in self.script:
+                try:
+                    request = next(requests)
+                    assert request.audio_content
+                    self.frames += 1
+                except StopIteration:
+                    pass
+                except Exception as exc:  # e.g. reading a closed mmap
+                    self.frame_errors.append(exc)
+                    raise
+                if isinstance(step, Exception):
+                    raise step
+                if callable(step):
+                    step()
+                    continue
+                yield step
+        finally:
+            self.finished.set()
+
+
+async def _collect(client, audio=AUDIO):
+    return [segment async for segment in transcribe_audio_stream(audio, client)]
+
+
+def test_yields_interim_and_final_segments_in_order():
+    client = FakeSpeechClient([
+        _response("pump one oh", False),
+        _response("Pump P-101 is leaking.", True),
+        _response("replaced the", False),
+        _response("Replaced the seal.", True),
+    ])
+    segments = asyncio.run(_collect(client))
+    assert segments == [
+        TranscriptSegment("pump one oh", False),
+        TranscriptSegment("Pump P-101 is leaking.", True),
+        TranscriptSegment("replaced the", False),
+        TranscriptSegment("Replaced the seal.", True),
+    ]
+    assert client.frames == 4
+
+    client = FakeSpeechClient(client.script)
+    assert asyncio.run(transcribe_audio(AUDIO, client)) == "Pump P-101 is leaking. Replaced the seal."
+
+
+def test_errors_from_the_stream_reach_the_caller():
+    client = FakeSpeechClient([
+        _response("Pump P-101 is leaking.", True),
+        RuntimeError("stream reset by peer"),
+    ])
+    with pytest.raises(RuntimeError, match="stream reset by peer"):
+        asyncio.run(_collect(client))
+    assert client.finished.is_set()
+
+
+def test_mmap_stays_open_until_the_worker_is_done():
+    # The consumer stops after the first segment; the worker is still
+    # sending frames and must be finished before the caller closes the map.
+    def slow():
+        time.sleep(0.05)
+
+    client = FakeSpeechClient([_response("first", True), slow, slow, _response("late", True)])
+
+    async def scenario(audio):
+        stream = transcribe_audio_stream(audio, client)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    with tempfile.TemporaryFile() as f:
+        f.write(AUDIO)
+        f.flush()
+        audio = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        first = asyncio.run(scenario(audio))
+        assert client.finished.is_set()
+        audio.close()
+
+    assert first.text == "first"
+    assert client.frame_errors == []
+
+
+def test_ner_starts_before_the_stream_ends(monkeypatch):
+    monkeypatch.setattr(get_settings(), "voice_ner_window_chars", 60)
+    monkeypatch.setattr(voice, "_asset_matcher", None)
+    ner_started = threading.Event()
+    calls = []
+
+    async def extract_knowledge_observation(text):
+        calls.append(text)
+        ner_started.set()
+        return {"target_asset_tag": "P-101", "observed_issue": text, "confidence_index": 0.9}
+
+    monkeypatch.setattr(voice, "extract_knowledge_observation", extract_knowledge_observation)
+    waited = []
+
+    def wait_for_ner():
+        # Recognition is held open until the first window has been sent to NER.
+        waited.append(ner_started.wait(timeout=2))
+
+    client = FakeSpeechClient([
+        _response("Pump P-101 seal is leaking at the", False),
+        _response("Pump P-101 seal is leaking at the gland.", True),
+        _response("Pressure dropped to four bar.", True),
+        wait_for_ner,
+        _response("Replaced the packing.", True),
+    ])
+    transcript, extracted = asyncio.run(voice.transcribe_and_extract(AUDIO, client))
+
+    assert waited == [True]
+    assert transcript == "Pump P-101 seal is leaking at the gland. Pressure dropped to four bar. Replaced the packing."
+    # Two windows, not one call per final segment.
+    assert calls == [
+        "Pump P-101 seal is leaking at the gland. Pressure dropped to four bar.",
+        "Replaced the packing.",
+    ]
+    assert extracted["target_asset_tag"] == "P-101"
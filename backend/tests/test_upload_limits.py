@@ -0,0 +1,129 @@
+import json
+import mmap
+import os
+import resource
+import subprocess
+import sys
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import routers.ingest as ingest
+from config import get_settings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOUNDARY = "----paperbrain"
+SERVER_CHUNK_BYTES = 64 * 1024
+RSS_GROWTH_LIMIT_BYTES = 3 * 1024 * 1024
+
+
+def _server_chunked(app):
+    # TestClient hands the whole body over in one ASGI message; uvicorn sends
+    # it in small pieces. Re-chunk it so we measure the app, not the harness.
+    async def asgi(scope, receive, send):
+        if scope["type"] != "http":
+            return await app(scope, receive, send)
+        state = {"body": memoryview(b""), "pos": 0, "more": True}
+
+        async def chunked_receive():
+            if state["pos"] >= len(state["body"]):
+                if not state["more"]:
+                    return await receive()
+                message = await receive()
+                if message["type"] != "http.request":
+                    return message
+                state.update(body=memoryview(message.get("body", b"")), pos=0, more=message.get("more_body", False))
+            body, pos = state["body"], state["pos"]
+            state["pos"] = pos + SERVER_CHUNK_BYTES
+            more = state["more"] or state["pos"] < len(body)
+            return {"type": "http.request", "body": bytes(body[pos:state["pos"]]), "more_body": more}
+
+        await app(scope, chunked_receive, send)
+
+    return asgi
+
+
+def _multipart(size: int) -> bytes:
+    return (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="note.webm"\r\n'
+        f"Content-Type: audio/webm\r\n\r\n".encode()
+        + b"\x01" * size
+        + f"\r\n--{BOUNDARY}--\r\n".encode()
+    )
+
+
+def _peak_rss_bytes() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB on Linux
+
+
+def _measure_upload(size: int) -> None:
+    # Runs in a fresh interpreter (see _upload_in_subprocess): ru_maxrss is
+    # a high-water mark, so the process must not have peaked above the
+    # baseline before. Prints the status, what the handler saw, and how far
+    # the peak RSS rose while the request was handled.
+    seen = []
+
+    async def ingest_voice_note(audio, author):
+        # Touch both ends of the map so it is really read.
+        assert isinstance(audio, mmap.mmap)
+        assert audio[:1] == audio[-1:] == b"\x01"
+        seen.append(len(audio))
+        return {"observation_id": "obs-1", "transcript": "ok", "asset_linked": None, "extracted": {}}
+
+    ingest.ingest_voice_note = ingest_voice_note
+    client = TestClient(_server_chunked(main.app))
+    headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+    client.post("/ingest/voice", content=_multipart(2 * 1024 * 1024), headers=headers)  # warm up lazy imports
+    seen.clear()
+
+    body = _multipart(size)  # the client's copy, counted in the baseline
+    baseline = _peak_rss_bytes()
+    response = client.post("/ingest/voice", content=body, headers=headers)
+    print(json.dumps({"status": response.status_code, "seen": seen, "growth": _peak_rss_bytes() - baseline}))
+
+
+def _upload_in_subprocess(size: int) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", f"import tests.test_upload_limits as t; t._measure_upload({size})"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_upload_well_under_the_limit_stays_out_of_rss():
+    size = get_settings().max_voice_upload_bytes // 2
+    result = _upload_in_subprocess(size)
+
+    assert result["status"] == 200
+    assert result["seen"] == [size]
+    # Starlette's spool and the mmap are file-backed; peak RSS grows by a
+    # few buffers, never by the file.
+    assert result["growth"] < RSS_GROWTH_LIMIT_BYTES < size
+
+
+def test_upload_just_over_the_limit_is_rejected():
+    # Inside the middleware's multipart slack, so mapped_upload has to catch it.
+    result = _upload_in_subprocess(get_settings().max_voice_upload_bytes + 1)
+
+    assert result["status"] == 413
+    assert result["seen"] == []
+    assert result["growth"] < RSS_GROWTH_LIMIT_BYTES
+
+
+def test_declared_oversize_upload_is_rejected_before_reading(monkeypatch):
+    seen = []
+
+    async def ingest_voice_note(audio, author):
+        seen.append(len(audio))
+
+    monkeypatch.setattr(ingest, "ingest_voice_note", ingest_voice_note)
+    client = TestClient(main.app)
+    response = client.post(
+        "/ingest/voice",
+        content=_multipart(3 * get_settings().max_voice_upload_bytes),
+        headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+    )
+
+    assert response.status_code == 413
+    assert seen == []
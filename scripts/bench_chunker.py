@@ -0,0 +1,148 @@
+"""
+Micro-benchmark: offset-based chunker (services/chunker.py) vs the previous
+token-join + fixed-window chunker, on synthetic multi-thousand-page
+Document AI-shaped documents. Needs no Google credentials.
+
+Run from backend/ with venv active:
+  python ../scripts/bench_chunker.py
+  python ../scripts/bench_chunker.py --pages 5000 --repeat 3
+"""
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import argparse
+import random
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from services.chunker import page_bounds, layout_breaks, chunk_spans, materialize
+
+WORDS = (
+    "pump valve boiler seal bearing impeller torque pressure flow rate shaft motor "
+    "coupling vibration cavitation suction discharge inspection maintenance interval "
+    "operator shutdown alarm threshold temperature lubrication alignment gland packing"
+).split()
+
+
+def _segment(start, end):
+    return SimpleNamespace(start_index=start, end_index=end)
+
+
+def _anchor(start, end):
+    return SimpleNamespace(layout=SimpleNamespace(text_anchor=SimpleNamespace(text_segments=[_segment(start, end)])))
+
+
+def build_document(pages: int, paragraphs_per_page: int, seed: int = 7):
+    rng = random.Random(seed)
+    parts = []
+    doc_pages = []
+    offset = 0
+    for _ in range(pages):
+        page_start = offset
+        tokens, paragraphs = [], []
+        for _ in range(paragraphs_per_page):
+            paragraph_start = offset
+            for _ in range(rng.randint(3, 7)):
+                sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + ". "
+                for word in sentence.split(" "):
+                    if word:
+                        tokens.append(_anchor(offset, offset + len(word)))
+                    offset += len(word) + 1
+                parts.append(sentence + " ")
+            parts.append("\n")
+            offset += 1
+            paragraphs.append(_anchor(paragraph_start, offset))
+        page = SimpleNamespace(
+            layout=SimpleNamespace(text_anchor=SimpleNamespace(text_segments=[_segment(page_start, offset)])),
+            tokens=tokens,
+            paragraphs=paragraphs,
+            lines=[],
+        )
+        doc_pages.append(page)
+    return SimpleNamespace(text="".join(parts), pages=doc_pages)
+
+
+# ─── Previous implementation, kept here for comparison ───────────────────────
+
+def legacy_extract_page_text(full_text, page):
+    segments = []
+    for token in page.tokens:
+        for seg in token.layout.text_anchor.text_segments:
+            start = int(seg.start_index) if seg.start_index else 0
+            end = int(seg.end_index)
+            segments.append(full_text[start:end])
+    return " ".join(segments)
+
+
+def legacy_chunk_text(text, max_chars=1500, overlap_chars=150):
+    if len(text) <= max_chars:
+        return [text]
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = start + max_chars
+        chunks.append(text[start:end])
+        start = end - overlap_chars
+    return chunks
+
+
+def run_legacy(document):
+    chunks = []
+    for page in document.pages:
+        page_text = legacy_extract_page_text(document.text, page)
+        if page_text.strip():
+            chunks.extend(legacy_chunk_text(page_text))
+    return chunks
+
+
+def run_offsets(document):
+    chunks = []
+    for page in document.pages:
+        bounds = page_bounds(page)
+        if bounds is None:
+            continue
+        spans = chunk_spans(document.text, *bounds, breaks=layout_breaks(page))
+        chunks.extend(materialize(document.text, spans))
+    return chunks
+
+
+def measure(fn, document, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunks = fn(document)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    fn(document)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return chunks, best, peak
+
+
+def sentence_aligned(chunks):
+    return sum(1 for c in chunks if c.rstrip()[-1:] in (".", "?", "!")) / len(chunks)
+
+
+def main(args):
+    print(f"Building synthetic document: {args.pages} pages x {args.paragraphs} paragraphs ...")
+    document = build_document(args.pages, args.paragraphs)
+    print(f"  {len(document.text):,} chars, {sum(len(p.tokens) for p in document.pages):,} tokens\n")
+
+    for name, fn in (("legacy", run_legacy), ("offsets", run_offsets)):
+        chunks, seconds, peak = measure(fn, document, args.repeat)
+        avg = sum(len(c) for c in chunks) / len(chunks)
+        print(
+            f"  {name:<8} {seconds * 1000:9.1f} ms   peak {peak / 1e6:8.1f} MB   "
+            f"{len(chunks):7,} chunks   avg {avg:6.0f} chars   "
+            f"ends on sentence {sentence_aligned(chunks):6.1%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=3000)
+    parser.add_argument("--paragraphs", type=int, default=6, help="paragraphs per page")
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
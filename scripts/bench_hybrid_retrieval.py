@@ -0,0 +1,190 @@
+"""
+Latency benchmark for the GraphRAG hybrid route: the previous sequential
+wiring (Qdrant, then Neo4j) vs the parallel fan-out, with and without the
+speculative query embedding. Qdrant, Neo4j, the embedding call and Gemini are
+replaced by stand-ins that sleep for a configurable time, so it needs no
+credentials or running databases.
+
+The answer cache is switched off: its lookup already starts the embedding
+before routing, which would make every row "speculative". Speculation only
+pays off while routing takes time, hence the non-zero --classify-ms default.
+
+Run from backend/ with venv active:
+  python ../scripts/bench_hybrid_retrieval.py
+  python ../scripts/bench_hybrid_retrieval.py --embed-ms 120 --qdrant-ms 40 --neo4j-ms 90 --classify-ms 150
+"""
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+# Settings need these to load; the stand-ins never reach Google or Neo4j.
+for _key in ("GOOGLE_API_KEY", "GOOGLE_CLOUD_PROJECT", "GOOGLE_APPLICATION_CREDENTIALS",
+             "DOCUMENTAI_PROCESSOR_ID", "NEO4J_URI", "NEO4J_USER", "NEO4J_PASSWORD"):
+    os.environ.setdefault(_key, "benchmark")
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import zlib
+from types import SimpleNamespace
+
+from langgraph.graph import StateGraph, END
+
+import pipelines.graphrag_pipeline as graphrag
+import services.answer_cache as answer_cache
+from config import get_settings
+
+QUESTION = "What happens downstream if P-101 trips, and what is the maintenance procedure for its seal?"
+
+
+class FakeQdrant:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def query_points(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        point = SimpleNamespace(
+            payload={"chunk_text": "Replace the mechanical seal every 4000 hours.", "source_file": "p101.pdf", "page_number": 3},
+            score=0.82
+        )
+        return SimpleNamespace(points=[point] * 5)
+
+
+class FakeResult:
+    def __aiter__(self):
+        return self._records()
+
+    async def _records(self):
+        yield {
+            "a": {"tag_number": "P-101", "id": "PUMP-101", "manufacturer": "FlowServe", "model_number": "XR-900"},
+            "downstream_paths": [["P-101", "B-04"]],
+            "upstream_paths": [["P-101", "V-20"]],
+            "observations": [{"issue": "Seal leak", "action": "Replaced seal"}]
+        }
+
+
+class FakeSession:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, **params):
+        await asyncio.sleep(self.delay)
+        return FakeResult()
+
+
+class FakeDriver:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def session(self):
+        return FakeSession(self.delay)
+
+
+def install_stand_ins(args) -> None:
+    qdrant, driver = FakeQdrant(args.qdrant_ms / 1000), FakeDriver(args.neo4j_ms / 1000)
+
+    async def get_qdrant_client():
+        return qdrant
+
+    async def get_driver():
+        return driver
+
+    async def embed_text(text):
+        await asyncio.sleep(args.embed_ms / 1000)
+        # Deterministic per text, and not the zero vector.
+        rng = random.Random(zlib.crc32(text.encode()))
+        return [rng.uniform(-1.0, 1.0) for _ in range(768)]
+
+    async def chat_complete(prompt):
+        return "stub answer"
+
+    classify = graphrag.classify_query
+
+    async def slow_classify(state):
+        # Stands in for a model-based router.
+        await asyncio.sleep(args.classify_ms / 1000)
+        return await classify(state)
+
+    graphrag.get_qdrant_client = get_qdrant_client
+    graphrag.get_driver = get_driver
+    graphrag.embed_text = embed_text
+    graphrag.chat_complete = chat_complete
+    graphrag.classify_query = slow_classify
+
+
+# ─── Previous wiring, kept here for comparison ───────────────────────────────
+
+def build_sequential_graph():
+    graph = StateGraph(graphrag.GraphRAGState)
+    graph.add_node("classify_query", graphrag.classify_query)
+    graph.add_node("retrieve_from_qdrant", graphrag.retrieve_from_qdrant)
+    graph.add_node("retrieve_from_neo4j", graphrag.retrieve_from_neo4j)
+    graph.add_node("fuse_context", graphrag.fuse_context)
+    graph.set_entry_point("classify_query")
+    graph.add_conditional_edges(
+        "classify_query",
+        lambda s: s["route"],
+        {"vector": "retrieve_from_qdrant", "graph": "retrieve_from_neo4j", "hybrid": "retrieve_from_qdrant"}
+    )
+    graph.add_conditional_edges(
+        "retrieve_from_qdrant",
+        lambda s: "neo4j" if s["route"] == "hybrid" else "fuse",
+        {"neo4j": "retrieve_from_neo4j", "fuse": "fuse_context"}
+    )
+    graph.add_edge("retrieve_from_neo4j", "fuse_context")
+    graph.add_edge("fuse_context", END)
+    return graph.compile()
+
+
+async def measure(app, speculative: bool, repeat: int) -> list[float]:
+    graphrag._retrieval_app = app
+    get_settings().graphrag_speculative_embedding = speculative
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await graphrag.run_query(QUESTION)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert result["route_taken"] == "hybrid", result["route_taken"]
+    return timings
+
+
+async def main(args):
+    install_stand_ins(args)
+    get_settings().answer_cache_max_entries = 0
+    answer_cache._cache = None
+    print(
+        f"Stand-in latencies: classify {args.classify_ms}ms, embed {args.embed_ms}ms, "
+        f"qdrant {args.qdrant_ms}ms, neo4j {args.neo4j_ms}ms\n"
+    )
+    modes = (
+        ("sequential", build_sequential_graph(), False),
+        ("parallel", graphrag._build_graph(), False),
+        ("parallel+speculative", graphrag._build_graph(), True),
+    )
+    baseline = None
+    for name, app, speculative in modes:
+        timings = await measure(app, speculative, args.repeat)
+        p50 = statistics.median(timings)
+        baseline = baseline or p50
+        print(
+            f"  {name:<22} p50 {p50:7.1f} ms   min {min(timings):7.1f} ms   "
+            f"max {max(timings):7.1f} ms   {baseline / p50:4.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--classify-ms", type=float, default=40.0)
+    parser.add_argument("--embed-ms", type=float, default=80.0)
+    parser.add_argument("--qdrant-ms", type=float, default=30.0)
+    parser.add_argument("--neo4j-ms", type=float, default=60.0)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
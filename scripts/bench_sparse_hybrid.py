@@ -0,0 +1,188 @@
+"""
+Offline retrieval benchmark: dense-only vs dense + BM25 sparse (RRF fusion)
+search for exact part numbers and work-order codes ("XR-900 torque",
+"WO-2019-0847"). Builds a synthetic maintenance corpus in a throwaway
+collection, runs the same code-bearing questions through
+graphrag_pipeline._search_chunks in both modes, and reports recall@k and
+search latency.
+
+Dense vectors come from a local stand-in that, like a general-purpose
+embedding model, mostly sees "a pump model number" rather than the exact
+digits. Pass --vertex to embed with text-embedding-004 instead (needs the
+usual Google credentials in backend/.env). Latency from the in-process
+:memory: Qdrant scans sparse vectors in Python and overstates the sparse
+cost; point --qdrant-url at a server for representative timings.
+
+Run from backend/ with venv active:
+  python ../scripts/bench_sparse_hybrid.py
+  python ../scripts/bench_sparse_hybrid.py --chunks 20000 --queries 300
+  python ../scripts/bench_sparse_hybrid.py --qdrant-url http://localhost:6333 --vertex
+"""
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import argparse
+import asyncio
+import random
+import re
+import statistics
+import time
+import zlib
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import PointStruct
+
+if "--vertex" not in sys.argv:
+    # Settings need these to load; the stand-in never reaches Google.
+    for _key in ("GOOGLE_API_KEY", "GOOGLE_CLOUD_PROJECT", "GOOGLE_APPLICATION_CREDENTIALS",
+                 "DOCUMENTAI_PROCESSOR_ID", "NEO4J_URI", "NEO4J_USER", "NEO4J_PASSWORD"):
+        os.environ.setdefault(_key, "benchmark")
+
+import database.qdrant_client as qdrant
+import pipelines.graphrag_pipeline as graphrag
+from services.sparse_encoder import encode_document, encode_query
+from config import get_settings
+
+KS = (1, 5, 10)
+EQUIPMENT = ["pump", "valve", "boiler", "compressor", "heat exchanger", "extruder", "turbine", "fan"]
+SPECS = ["torque", "pressure", "seal", "bearing", "calibration", "lubrication", "alignment", "vibration"]
+FILLER = (
+    "Inspect the assembly for wear and record readings in the maintenance log. "
+    "Isolate and lock out the unit before removing guards. Check fasteners and "
+    "replace gaskets that show compression set. Verify operation after restart."
+)
+
+
+def make_code(rng: random.Random) -> str:
+    shape = rng.choice(("model", "work_order", "tag"))
+    if shape == "model":
+        return f"{rng.choice('ABCDKRTXZ')}{rng.choice('ABCDKRTXZ')}-{rng.randint(100, 999)}"
+    if shape == "work_order":
+        return f"WO-{rng.randint(2015, 2025)}-{rng.randint(0, 9999):04d}"
+    return f"{rng.choice('PTVCE')}-{rng.choice(('EXT', 'HX', 'CW', 'ST'))}-{rng.randint(1, 99):03d}"
+
+
+def build_corpus(chunks: int, codes: int, seed: int) -> tuple[list[str], dict[str, set[int]]]:
+    rng = random.Random(seed)
+    code_list = list(dict.fromkeys(make_code(rng) for _ in range(codes * 2)))[:codes]
+    texts, where = [], {code: set() for code in code_list}
+    for i in range(chunks):
+        code = rng.choice(code_list)
+        equipment, spec = rng.choice(EQUIPMENT), rng.choice(SPECS)
+        value = rng.randint(10, 400)
+        texts.append(
+            f"{equipment.title()} {code}: {spec} specification is {value} units. "
+            f"See procedure for {equipment} {spec} checks. {FILLER}"
+        )
+        where[code].add(i)
+    return texts, where
+
+
+class StandInEmbedder:
+    # Hashed bag of words through a fixed random projection. Digits collapse
+    # to '#', so "XR-900" and "XR-417" look the same, which is roughly how a
+    # general embedding model treats unfamiliar codes.
+
+    def __init__(self, dim: int, seed: int):
+        self.dim = dim
+        self.seed = seed
+        self._rows: dict[int, np.ndarray] = {}
+
+    def _row(self, token: str) -> np.ndarray:
+        key = zlib.crc32(token.encode())
+        if key not in self._rows:
+            self._rows[key] = np.random.default_rng(key ^ self.seed).standard_normal(self.dim)
+        return self._rows[key]
+
+    def embed(self, text: str) -> list[float]:
+        tokens = re.findall(r"[a-z#]+", re.sub(r"\d", "#", text.lower()))
+        vector = sum((self._row(t) for t in tokens), np.zeros(self.dim))
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+
+async def embed_all(texts: list[str], embedder: StandInEmbedder | None) -> list[list[float]]:
+    if embedder:
+        return [embedder.embed(t) for t in texts]
+    from services.embedding_service import embed_texts
+    return await embed_texts(texts)
+
+
+async def load(client: AsyncQdrantClient, texts: list[str], vectors: list[list[float]]) -> None:
+    collection = get_settings().qdrant_collection_name
+    for start in range(0, len(texts), 512):
+        await client.upsert(
+            collection_name=collection,
+            points=[
+                PointStruct(
+                    id=i,
+                    vector={qdrant.DENSE_VECTOR: vectors[i], qdrant.SPARSE_VECTOR: encode_document(texts[i])},
+                    payload={"chunk_text": texts[i], "source_file": "bench.pdf", "page_number": 1, "chunk_index": i}
+                )
+                for i in range(start, min(start + 512, len(texts)))
+            ],
+            wait=True
+        )
+
+
+async def evaluate(client, queries, query_vectors, relevant, hybrid: bool) -> tuple[dict[int, float], list[float]]:
+    recalls = {k: [] for k in KS}
+    timings = []
+    for query, vector, wanted in zip(queries, query_vectors, relevant):
+        sparse = encode_query(query) if hybrid else None
+        started = time.perf_counter()
+        points = await graphrag._search_chunks(client, vector, sparse)
+        timings.append((time.perf_counter() - started) * 1000)
+        ids = [p.id for p in points]
+        for k in KS:
+            recalls[k].append(len(wanted & set(ids[:k])) / min(k, len(wanted)))
+    return {k: statistics.mean(v) for k, v in recalls.items()}, timings
+
+
+async def main(args):
+    settings = get_settings()
+    settings.qdrant_collection_name = f"bench_sparse_hybrid_{os.getpid()}"
+    embedder = None if args.vertex else StandInEmbedder(args.dim, args.seed)
+    settings.qdrant_vector_size = args.dim if embedder else settings.qdrant_vector_size
+    graphrag.VECTOR_TOP_K = max(KS)
+
+    texts, where = build_corpus(args.chunks, args.codes, args.seed)
+    rng = random.Random(args.seed + 1)
+    present = sorted(code for code, ids in where.items() if ids)
+    asked = rng.sample(present, min(args.queries, len(present)))
+    queries = [f"{code} {rng.choice(SPECS)}" for code in asked]
+    relevant = [where[code] for code in asked]
+
+    client = AsyncQdrantClient(url=args.qdrant_url) if args.qdrant_url else AsyncQdrantClient(":memory:")
+    try:
+        await qdrant._ensure_collection(client, settings)
+        started = time.perf_counter()
+        await load(client, texts, await embed_all(texts, embedder))
+        print(f"Loaded {len(texts)} chunks ({len(present)} distinct codes) in {time.perf_counter() - started:.1f}s")
+        query_vectors = await embed_all(queries, embedder)
+
+        print(f"{len(queries)} queries, prefetch {settings.qdrant_prefetch_limit} per vector type\n")
+        for name, hybrid in (("dense only", False), ("dense + sparse", True)):
+            recall, timings = await evaluate(client, queries, query_vectors, relevant, hybrid)
+            cells = "   ".join(f"recall@{k} {recall[k]:.3f}" for k in KS)
+            print(f"  {name:<16} {cells}   p50 {statistics.median(timings):6.2f} ms   "
+                  f"p95 {np.percentile(timings, 95):6.2f} ms")
+    finally:
+        target = await qdrant._alias_target(client, settings.qdrant_collection_name)
+        if target:
+            await client.delete_collection(target)
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--codes", type=int, default=800)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=256, help="stand-in embedding size")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--qdrant-url", default=None, help="default: in-process :memory: Qdrant")
+    parser.add_argument("--vertex", action="store_true", help="embed with Vertex AI instead of the stand-in")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,221 @@
+"""
+Bulk-ingests every PDF in a directory through a staged pipeline:
+
+  read+OCR  ->  chunk  ->  embed  ->  write (Qdrant + Neo4j)
+
+Each stage has its own concurrency limit and hands work to the next stage
+through a bounded queue, so OCR of one file overlaps embedding and writes of
+the files before it. Per-stage throughput is printed at the end.
+
+Run from backend/ with venv active:
+  python ../scripts/bulk_ingest.py ../data/docs
+  python ../scripts/bulk_ingest.py ../data/docs --asset-map asset_map.csv --ocr-workers 8
+
+The optional asset map is a CSV with `filename,asset_tag` columns.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import argparse
+import asyncio
+import csv
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from database.neo4j_client import init_driver, close_driver
+from database.qdrant_client import init_qdrant, close_qdrant
+from services.documentai_service import read_pages, split_into_chunks
+from services.embedding_service import embed_texts, close_embedding_cache
+from services.google_clients import close_google_clients
+from services.pdf_service import page_fingerprints
+from pipelines.ingestion_pipeline import attach_page_hashes, select_new_chunks, store_chunks
+
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    name: str
+    unit: str
+    workers: int
+    files: int = 0
+    units: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    first_start: float | None = None
+    last_end: float = 0.0
+
+    def line(self) -> str:
+        wall = (self.last_end - self.first_start) if self.first_start else 0.0
+        rate = self.units / wall if wall > 0 else 0.0
+        return (
+            f"  {self.name:<6} workers={self.workers:<3} files={self.files:<5} "
+            f"{self.unit}={self.units:<7} errors={self.errors:<3} "
+            f"busy={self.busy_seconds:8.1f}s  wall={wall:8.1f}s  {rate:8.1f} {self.unit}/s"
+        )
+
+
+@dataclass
+class Item:
+    path: str
+    filename: str
+    asset_tag: str | None
+    pages: list = field(default_factory=list)
+    fingerprints: list[str] = field(default_factory=list)
+    chunks: list[dict] = field(default_factory=list)
+    skipped: int = 0
+    vectors: list[list[float]] = field(default_factory=list)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _chunk_pages(item: Item) -> list[dict]:
+    return attach_page_hashes(split_into_chunks(item.pages, item.filename), item.fingerprints)
+
+
+# File reads and chunking run in worker threads so a large PDF in one stage
+# doesn't stall the event loop, and with it every other stage's workers.
+async def ocr_stage(item: Item) -> int:
+    pdf_bytes = await asyncio.to_thread(_read_file, item.path)
+    item.fingerprints = await asyncio.to_thread(page_fingerprints, pdf_bytes)
+    item.pages = await read_pages(pdf_bytes)
+    return len(item.pages)
+
+
+async def chunk_stage(item: Item) -> int:
+    chunks = await asyncio.to_thread(_chunk_pages, item)
+    item.pages = []  # release the OCR payload as soon as possible
+    item.chunks, item.skipped = await select_new_chunks(chunks, item.asset_tag)
+    return len(item.chunks)
+
+
+async def embed_stage(item: Item) -> int:
+    item.vectors = await embed_texts([c["chunk_text"] for c in item.chunks])
+    return len(item.vectors)
+
+
+async def write_stage(item: Item) -> int:
+    if not item.chunks:
+        return 0
+    result = await store_chunks(item.chunks, item.vectors, item.asset_tag)
+    return result["chunks_stored"]
+
+
+async def run_stage(stage, stats: StageStats, inbox: asyncio.Queue, outbox: asyncio.Queue | None, next_workers: int):
+    async def worker():
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            started = time.perf_counter()
+            stats.first_start = stats.first_start or started
+            try:
+                units = await stage(item)
+                stats.units += units
+                stats.files += 1
+            except Exception as exc:
+                stats.errors += 1
+                print(f"  [{stats.name}] {item.filename}: {exc}")
+                continue
+            finally:
+                ended = time.perf_counter()
+                stats.busy_seconds += ended - started
+                stats.last_end = max(stats.last_end, ended)
+            if outbox is not None:
+                await outbox.put(item)
+
+    await asyncio.gather(*(worker() for _ in range(stats.workers)))
+    if outbox is not None:
+        for _ in range(next_workers):
+            await outbox.put(_DONE)
+
+
+def load_asset_map(path: str | None) -> dict[str, str]:
+    if not path:
+        return {}
+    with open(path, newline="") as f:
+        return {row["filename"]: row["asset_tag"] for row in csv.DictReader(f) if row.get("asset_tag")}
+
+
+async def report_progress(all_stats: list[StageStats], interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        print("  " + " | ".join(f"{s.name}: {s.files} files / {s.units} {s.unit}" for s in all_stats))
+
+
+async def main(args):
+    asset_map = load_asset_map(args.asset_map)
+    files = sorted(
+        name for name in os.listdir(args.directory)
+        if name.lower().endswith(".pdf")
+    )
+    if not files:
+        print(f"No PDF files found in {args.directory}")
+        return
+
+    # The default pool runs the file reads, fingerprints and chunking; size it
+    # so the stage limits, not the pool, decide how many run at once.
+    thread_workers = args.ocr_workers + args.chunk_workers + args.embed_workers + args.write_workers
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=thread_workers))
+
+    await init_driver()
+    await init_qdrant()
+
+    stages = [
+        (ocr_stage, StageStats("ocr", "pages", args.ocr_workers)),
+        (chunk_stage, StageStats("chunk", "chunks", args.chunk_workers)),
+        (embed_stage, StageStats("embed", "chunks", args.embed_workers)),
+        (write_stage, StageStats("write", "points", args.write_workers)),
+    ]
+    queues = [asyncio.Queue(maxsize=args.queue_size) for _ in stages]
+
+    async def feed():
+        for name in files:
+            await queues[0].put(Item(os.path.join(args.directory, name), name, asset_map.get(name)))
+        for _ in range(stages[0][1].workers):
+            await queues[0].put(_DONE)
+
+    all_stats = [stats for _, stats in stages]
+    reporter = asyncio.create_task(report_progress(all_stats, args.report_every))
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(
+            feed(),
+            *(
+                run_stage(
+                    stage, stats, queues[i],
+                    queues[i + 1] if i + 1 < len(stages) else None,
+                    stages[i + 1][1].workers if i + 1 < len(stages) else 0
+                )
+                for i, (stage, stats) in enumerate(stages)
+            )
+        )
+    finally:
+        reporter.cancel()
+        await close_driver()
+        await close_qdrant()
+        await close_google_clients()
+        close_embedding_cache()
+
+    elapsed = time.perf_counter() - started
+    print(f"\nIngested {len(files)} files in {elapsed:.1f}s ({len(files) / elapsed:.2f} files/s)")
+    for stats in all_stats:
+        print(stats.line())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-ingest a directory of PDFs into Paper Brain")
+    parser.add_argument("directory")
+    parser.add_argument("--asset-map", help="CSV with filename,asset_tag columns")
+    parser.add_argument("--ocr-workers", type=int, default=4)
+    parser.add_argument("--chunk-workers", type=int, default=2)
+    parser.add_argument("--embed-workers", type=int, default=4)
+    parser.add_argument("--write-workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=8, help="max files waiting between stages")
+    parser.add_argument("--report-every", type=float, default=15.0, help="seconds between progress lines")
+    asyncio.run(main(parser.parse_args()))